@@ -0,0 +1,102 @@
+"""Conditional GET support for read endpoints.
+
+Every write bumps the shard's data version (see DatabaseManager), so a
+response is fully determined by (endpoint, params, data version). That key
+drives both the ETag sent to clients and a small in-process cache of
+rendered bodies, letting polls between fetch runs skip the query and the
+serialization entirely.
+"""
+
+import hashlib
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from backend.api.serialization import dumps
+
+# Part of every ETag: bump when a response's shape changes (fields added or
+# renamed), so clients revalidating after a deploy do not keep old-shape bodies
+RESPONSE_SCHEMA_VERSION = 2
+
+class ResponseCache:
+    """LRU cache of rendered response bodies keyed by (endpoint, params, version)"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def set(self, key: Hashable, body: bytes):
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+def make_etag(key: Tuple) -> str:
+    return '"' + hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:20] + '"'
+
+def is_not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since
+
+    If-Modified-Since is ignored when If-None-Match is present (RFC 9110
+    section 13.1.3). It only has one-second resolution, so a 304 needs the
+    data to be strictly older than the header's second: a write in the same
+    second as the client's copy must not be hidden.
+    """
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return etag in candidates or '*' in candidates
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since:
+        try:
+            return last_modified < parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
+def conditional_headers(data_version: Dict, key: Tuple) -> Dict[str, str]:
+    """ETag, Last-Modified and Cache-Control for a response identified by key"""
+    return {
+        'ETag': make_etag(key + (data_version['version'], RESPONSE_SCHEMA_VERSION)),
+        'Last-Modified': formatdate(data_version['updated_at'], usegmt=True),
+        'Cache-Control': 'no-cache',
+    }
+
+async def cached_json(
+    request: Request,
+    cache: ResponseCache,
+    data_version: Dict,
+    key: Tuple,
+    produce: Callable[[], Awaitable],
+) -> Response:
+    """Serve a JSON read endpoint with ETag/Last-Modified and a response cache
+
+    ``key`` identifies the endpoint and its parameters; ``produce`` is only
+    awaited when neither the client nor the cache holds the current version.
+    """
+    headers = conditional_headers(data_version, key)
+
+    if is_not_modified(request, headers['ETag'], data_version['updated_at']):
+        return Response(status_code=304, headers=headers)
+
+    full_key = key + (data_version['version'],)
+    body = cache.get(full_key)
+    if body is None:
+        body = dumps(await produce())
+        cache.set(full_key, body)
+
+    return Response(content=body, media_type='application/json', headers=headers)
@@ -1,9 +1,16 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date
+import asyncio
 import logging
+import threading
+import time
 import sys
 import os
 
@@ -13,15 +20,37 @@ import os
 # Add project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from backend.database.manager import DatabaseManager
-from backend.services.gmail_service import GmailService
-from backend.services.ai_service import AIService
+from backend.api.caching import ResponseCache, cached_json, conditional_headers, is_not_modified
+from backend.api.serialization import FastJSONResponse, dumps_lines, sse_message
+from backend.database.async_manager import AsyncDatabaseManager
+from backend.database.shards import ShardRegistry
+from backend.services.account_service import AccountService, DEFAULT_ACCOUNT
+from backend.services.ai_service import AIService, SummarizationError
 from backend.config import settings
+from backend.dedup import reuse_summary
+from backend.events import EVENTS
+from backend.metrics import HTTP_REQUEST_SECONDS, REGISTRY
+from backend.profiling import SamplingProfiler
+from backend.tracing import SLOW_TRACES, record_if_slow, trace
 
 logging.basicConfig(level=settings.log_level, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="InboxPrism API", version="1.0.0")
+def log_warmup_failure(future: asyncio.Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Opening the default database failed: {future.exception()}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    watcher = asyncio.create_task(watch_data_versions())
+    # Open the default shard (and run its migrations) in the background; /health answers meanwhile
+    warmup = asyncio.get_running_loop().run_in_executor(db_executor, shards.get, DEFAULT_ACCOUNT)
+    warmup.add_done_callback(log_warmup_failure)
+    yield
+    watcher.cancel()
+    db_executor.shutdown(wait=True)
+
+app = FastAPI(title="InboxPrism API", version="1.0.0", default_response_class=FastJSONResponse, lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -40,16 +69,219 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep cardinality bounded
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    profile = settings.profile_requests or (settings.debug and request.query_params.get("profile") == "1")
+    if not settings.slow_request_ms and not profile:
+        return await call_next(request)
+
+    profiler = SamplingProfiler(settings.profile_interval_ms / 1000) if profile else None
+    with trace(f"{request.method} {request.url.path}") as root:
+        if profiler:
+            profiler.start()
+        try:
+            response = await call_next(request)
+        finally:
+            if profiler:
+                profiler.stop()
+
+    root.attrs["status"] = response.status_code
+    record_if_slow(root, settings.slow_request_ms)
+
+    if profiler:
+        path = profiler.save(settings.profiles_dir, f"{request.method}-{request.url.path}")
+        logger.info(f"Profile for {request.method} {request.url.path} written to {path}")
+        response.headers["X-Profile-Path"] = path
+
+    return response
+
 # Initialize services
-db = DatabaseManager(settings.database_path)
-gmail_service = GmailService(settings.gmail_credentials_path, settings.gmail_token_path)
-ai_service = AIService()
+accounts = AccountService(settings)
+db_executor = ThreadPoolExecutor(max_workers=settings.db_max_workers, thread_name_prefix="db")
+shards = ShardRegistry(accounts.database_path, lambda path: AsyncDatabaseManager(path, executor=db_executor))
+_ai_service: Optional[AIService] = None
+_ai_service_lock = threading.Lock()
+
+def get_ai_service() -> AIService:
+    """Create the AI client on first use; this is what imports the provider SDK"""
+    global _ai_service
+    with _ai_service_lock:
+        if _ai_service is None:
+            _ai_service = AIService()
+        return _ai_service
+response_cache = ResponseCache(max_entries=settings.response_cache_entries)
+
+async def get_db(account: str) -> AsyncDatabaseManager:
+    """Resolve an account to its database shard
+
+    Opening a shard applies pending migrations, which can take seconds on a
+    large mailbox, so it happens on the database pool, not the event loop.
+    """
+    if not accounts.is_known(account):
+        raise HTTPException(status_code=404, detail=f"Unknown account: {account}")
+    shard = shards.get_open(account)
+    if shard is None:
+        shard = await asyncio.get_running_loop().run_in_executor(db_executor, shards.get, account)
+    return shard
 
 # Health check endpoint for Render
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "InboxPrism API"}
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/debug/traces")
+async def slow_traces():
+    """Span trees of recent slow requests (debug mode only)"""
+    if not settings.debug:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return FastJSONResponse(content={"traces": list(SLOW_TRACES)})
+
+@app.post("/api/debug/generate-data")
+async def generate_data(count: int = 1000, seed: Optional[int] = None, summary_rate: float = 0.8,
+                        account: str = DEFAULT_ACCOUNT):
+    """Bulk-load synthetic emails for load testing (debug mode only)"""
+    if not settings.debug:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not 0 < count <= 1_000_000:
+        raise HTTPException(status_code=400, detail="count must be between 1 and 1000000")
+
+    db = await get_db(account)
+    try:
+        from backend.services.synthetic_data import SyntheticMailbox
+
+        start = time.perf_counter()
+        mailbox = SyntheticMailbox(seed=seed if seed is not None else int(time.time()), summary_rate=summary_rate)
+        inserted = await db.bulk_insert_emails(mailbox.emails(count))
+        elapsed = time.perf_counter() - start
+        EVENTS.publish("job-progress", {
+            "account": account, "job": "generate-data", "processed": inserted, "total": count,
+        }, account)
+
+        return FastJSONResponse(content={
+            "message": f"Generated {inserted} synthetic emails",
+            "emails_created": inserted,
+            "seconds": round(elapsed, 3)
+        })
+    except Exception as e:
+        logger.error(f"Error generating synthetic data: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Last data version per shard that clients have been told about
+announced_versions: Dict[str, int] = {}
+
+async def watch_data_versions():
+    """Publish data-changed when a shard's data version moves
+
+    Catches writes made outside this process (run_processor) with one poll
+    per open shard, and only while someone is subscribed. Writes this process
+    already announced with email-saved or summary-saved are not repeated.
+    """
+    while True:
+        await asyncio.sleep(settings.events_poll_seconds)
+        if not EVENTS.subscriber_count:
+            continue
+
+        for account, db in shards.open_shards().items():
+            try:
+                data_version = await db.get_data_version()
+            except Exception as e:
+                logger.warning(f"Could not read data version for {account}: {e}")
+                continue
+
+            previous = announced_versions.get(account)
+            announced_versions[account] = data_version["version"]
+            if previous is not None and data_version["version"] > previous:
+                EVENTS.publish("data-changed", {"account": account, "version": data_version["version"]}, account)
+
+async def announce(account: str, db: AsyncDatabaseManager, event: str, data: Dict):
+    """Publish an event for a write made by this process, so watch_data_versions skips its version
+
+    The version is read after the write and before the event goes out: a
+    concurrent outside write it covers is seen by the refetch the event causes.
+    """
+    version = (await db.get_data_version())["version"]
+    announced_versions[account] = max(version, announced_versions.get(account, version))
+    EVENTS.publish(event, data, account)
+
+async def publish_email_saved(account: str, db: AsyncDatabaseManager, email_id: int, email: Dict):
+    await announce(account, db, "email-saved", {
+        "account": account,
+        "id": email_id,
+        "sender": email["sender"],
+        "subject": email["subject"],
+        "received_at": email["received_at"],
+    })
+
+async def publish_summary_saved(account: str, db: AsyncDatabaseManager, email_id: int, summary: Dict):
+    await announce(account, db, "summary-saved", {
+        "account": account,
+        "id": email_id,
+        "topic": summary["topic"],
+        "action_required": summary["action_required"],
+        "provider": summary["provider"],
+    })
+
+@app.get("/api/events")
+async def events(request: Request, account: str = DEFAULT_ACCOUNT):
+    """Server-Sent Events stream of live updates
+
+    Event types: email-saved, summary-saved, job-progress and data-changed
+    (writes no other event announced, e.g. by run_processor). Reconnecting clients
+    send Last-Event-ID and get missed events replayed; a ``reset`` event
+    means some were lost and the client should refetch.
+    """
+    # Opens the shard so the data version watcher covers it
+    await get_db(account)
+    subscription, replay, gap = EVENTS.subscribe(account, request.headers.get("last-event-id"))
+
+    async def stream():
+        try:
+            yield f"retry: {settings.events_retry_ms}\n\n".encode("utf-8")
+            if gap:
+                yield sse_message("reset", {"account": account, "reason": "missed events are no longer buffered"})
+            for event in replay:
+                yield sse_message(event.type, event.data, event.id)
+
+            while not (subscription.closed and subscription.queue.empty()):
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), settings.events_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield b": heartbeat\n\n"
+                    continue
+                yield sse_message(event.type, event.data, event.id)
+        finally:
+            EVENTS.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 class FetchEmailsRequest(BaseModel):
     hours: Optional[int] = 24
     summarize: Optional[bool] = True
@@ -67,37 +299,111 @@ class EmailSummary(BaseModel):
 async def root():
     return {"message": "InboxPrism API", "status": "running"}
 
+@app.get("/api/accounts")
+async def list_accounts():
+    """List configured mailbox accounts"""
+    return FastJSONResponse(content={"accounts": accounts.list_accounts()})
+
 @app.get("/api/stats")
-async def get_stats():
+async def get_stats(request: Request, account: str = DEFAULT_ACCOUNT):
     """Get email statistics"""
+    db = await get_db(account)
     try:
-        stats = db.get_stats()
-        return JSONResponse(content=stats)
+        # today_emails changes at midnight without any write
+        key = ("stats", account, date.today().isoformat())
+        return await cached_json(request, response_cache, await db.get_data_version(), key, db.get_stats)
     except Exception as e:
         logger.error(f"Error getting stats: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/digest")
+async def get_digest(request: Request, day: Optional[str] = Query(None, alias="date"),
+                     account: str = DEFAULT_ACCOUNT):
+    """Get the digest of one day's emails (default today): counts, ranked action items and overview"""
+    try:
+        day = date.fromisoformat(day).isoformat() if day else date.today().isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="date must be YYYY-MM-DD")
+
+    db = await get_db(account)
+    try:
+        key = ("digest", account, day)
+        return await cached_json(request, response_cache, await db.get_data_version(), key,
+                                 lambda: db.get_digest(day))
+    except Exception as e:
+        logger.error(f"Error getting digest for {day}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/emails")
-async def get_emails(limit: int = 50):
-    """Get emails with summaries from database"""
+async def get_emails(request: Request, limit: int = 50, account: str = DEFAULT_ACCOUNT, format: str = "json"):
+    """Get emails with summaries from database
+
+    With ``format=ndjson`` (or ``Accept: application/x-ndjson``) rows are
+    streamed one JSON object per line as they are read, so memory use does
+    not grow with ``limit``.
+    """
+    db = await get_db(account)
+
+    async def produce():
+        emails = await db.get_emails_with_summaries(limit=limit)
+        return {"emails": emails, "count": len(emails)}
+
     try:
-        emails = db.get_emails_with_summaries(limit=limit)
-        return JSONResponse(content={"emails": emails, "count": len(emails)})
+        data_version = await db.get_data_version()
+
+        if format == "ndjson" or "application/x-ndjson" in request.headers.get("accept", ""):
+            headers = conditional_headers(data_version, ("emails.ndjson", account, limit))
+            if is_not_modified(request, headers["ETag"], data_version["updated_at"]):
+                return Response(status_code=304, headers=headers)
+
+            async def stream():
+                async for batch in db.iter_emails_with_summaries(limit=limit):
+                    yield dumps_lines(batch)
+
+            return StreamingResponse(stream(), media_type="application/x-ndjson", headers=headers)
+
+        key = ("emails", account, limit)
+        return await cached_json(request, response_cache, data_version, key, produce)
     except Exception as e:
         logger.error(f"Error getting emails: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/emails/{email_id}")
+async def get_email(request: Request, email_id: int, account: str = DEFAULT_ACCOUNT):
+    """Get a single email with its full body and summary"""
+    db = await get_db(account)
+
+    async def produce():
+        email = await db.get_email(email_id)
+
+        if not email:
+            raise HTTPException(status_code=404, detail="Email not found")
+
+        return email
+
+    try:
+        key = ("email", account, email_id)
+        return await cached_json(request, response_cache, await db.get_data_version(), key, produce)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting email {email_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/fetch-emails")
-async def fetch_emails(request: FetchEmailsRequest):
+async def fetch_emails(request: FetchEmailsRequest, account: str = DEFAULT_ACCOUNT):
     """Fetch new emails from Gmail and optionally summarize them"""
+    db = await get_db(account)
     try:
-        logger.info(f"Fetching emails for last {request.hours} hours")
+        logger.info(f"Fetching emails for account {account}, last {request.hours} hours")
 
         # Fetch emails from Gmail
-        emails = gmail_service.fetch_emails(hours=request.hours)
+        gmail_service = await run_in_threadpool(accounts.gmail_service, account)
+        emails = await run_in_threadpool(gmail_service.fetch_emails, hours=request.hours)
 
         if not emails:
-            return JSONResponse(content={"message": "No new emails found", "count": 0})
+            return FastJSONResponse(content={"message": "No new emails found", "count": 0})
 
         processed_count = 0
         summarized_count = 0
@@ -105,7 +411,7 @@ async def fetch_emails(request: FetchEmailsRequest):
         for email in emails:
             try:
                 # Save email to database
-                email_id = db.save_email(
+                email_id = await db.save_email(
                     message_id=email['message_id'],
                     sender=email['sender'],
                     subject=email['subject'],
@@ -113,12 +419,19 @@ async def fetch_emails(request: FetchEmailsRequest):
                     received_at=email['received_at']
                 )
                 processed_count += 1
+                await publish_email_saved(account, db, email_id, email)
 
                 # Summarize if requested
                 if request.summarize and email['body'].strip():
-                    summary = ai_service.summarize_email(email['body'])
-
-                    db.save_summary(
+                    # Reuse a near-duplicate's summary before paying for an LLM call
+                    match = await db.get_cluster_summary(email_id)
+                    if match is not None:
+                        summary = reuse_summary(match)
+                    else:
+                        ai_service = await run_in_threadpool(get_ai_service)
+                        summary = await run_in_threadpool(ai_service.summarize_email, email['body'])
+
+                    await db.save_summary(
                         email_id=email_id,
                         topic=summary['topic'],
                         key_points=summary['key_points'],
@@ -127,12 +440,18 @@ async def fetch_emails(request: FetchEmailsRequest):
                         provider=summary['provider']
                     )
                     summarized_count += 1
+                    await publish_summary_saved(account, db, email_id, summary)
 
             except Exception as e:
+                # A failed summary leaves the email's job queued for run_processor to retry
                 logger.error(f"Error processing email {email.get('message_id', 'unknown')}: {e}")
-                continue
+            finally:
+                EVENTS.publish("job-progress", {
+                    "account": account, "job": "fetch-emails", "processed": processed_count,
+                    "summarized": summarized_count, "total": len(emails),
+                }, account)
 
-        return JSONResponse(content={
+        return FastJSONResponse(content={
             "message": f"Processed {processed_count} emails, summarized {summarized_count}",
             "processed": processed_count,
             "summarized": summarized_count
@@ -143,11 +462,11 @@ async def fetch_emails(request: FetchEmailsRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/summarize/{email_id}")
-async def summarize_email(email_id: int):
+async def summarize_email(email_id: int, account: str = DEFAULT_ACCOUNT):
     """Summarize a specific email by ID"""
+    db = await get_db(account)
     try:
-        emails = db.get_emails_with_summaries(limit=1000)  # Get all to find specific ID
-        email = next((e for e in emails if e['id'] == email_id), None)
+        email = await db.get_email(email_id)
 
         if not email:
             raise HTTPException(status_code=404, detail="Email not found")
@@ -155,9 +474,14 @@ async def summarize_email(email_id: int):
         if not email['body'].strip():
             raise HTTPException(status_code=400, detail="Email has no content to summarize")
 
-        summary = ai_service.summarize_email(email['body'])
+        ai_service = await run_in_threadpool(get_ai_service)
+        try:
+            summary = await run_in_threadpool(ai_service.summarize_email, email['body'])
+        except SummarizationError as e:
+            # The email stays queued for the processor's retries
+            raise HTTPException(status_code=429 if e.rate_limited else 502, detail=str(e))
 
-        db.save_summary(
+        await db.save_summary(
             email_id=email_id,
             topic=summary['topic'],
             key_points=summary['key_points'],
@@ -165,8 +489,9 @@ async def summarize_email(email_id: int):
             raw_summary=summary['raw_summary'],
             provider=summary['provider']
         )
+        await publish_summary_saved(account, db, email_id, summary)
 
-        return JSONResponse(content={"message": "Email summarized successfully", "summary": summary})
+        return FastJSONResponse(content={"message": "Email summarized successfully", "summary": summary})
 
     except HTTPException:
         raise
@@ -175,8 +500,9 @@ async def summarize_email(email_id: int):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/populate-test-data")
-async def populate_test_data():
+async def populate_test_data(account: str = DEFAULT_ACCOUNT):
     """Populate database with test emails for frontend testing"""
+    db = await get_db(account)
     try:
         import uuid
         from datetime import datetime, timedelta
@@ -209,13 +535,14 @@ async def populate_test_data():
         processed_count = 0
         for email in test_emails:
             # Save email to database
-            email_id = db.save_email(
+            email_id = await db.save_email(
                 message_id=email['message_id'],
                 sender=email['sender'],
                 subject=email['subject'],
                 body=email['body'],
                 received_at=email['received_at']
             )
+            await publish_email_saved(account, db, email_id, email)
             
             # Add AI summary
             try:
@@ -238,13 +565,14 @@ async def populate_test_data():
                         "action_required": "Schedule call tomorrow, urgent response needed"
                     }
                 
-                db.save_summary(email_id, **summary_data)
+                await db.save_summary(email_id, raw_summary=summary_data['topic'], provider='test', **summary_data)
+                await publish_summary_saved(account, db, email_id, {**summary_data, 'provider': 'test'})
                 processed_count += 1
                 
             except Exception as e:
                 logger.error(f"Error creating summary for test email {email_id}: {e}")
         
-        return JSONResponse(content={
+        return FastJSONResponse(content={
             "message": "Test data populated successfully",
             "emails_created": len(test_emails),
             "summaries_created": processed_count
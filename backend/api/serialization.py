@@ -0,0 +1,33 @@
+"""JSON rendering for API responses.
+
+Uses orjson when it is installed (several times faster than the standard
+library and emits bytes directly), falling back to json otherwise.
+"""
+
+import json
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+def dumps_lines(rows) -> bytes:
+    """Render rows as newline-delimited JSON"""
+    return b"".join(dumps(row) + b"\n" for row in rows)
+
+def sse_message(event_type: str, data: Any, event_id: Optional[str] = None) -> bytes:
+    """Render one Server-Sent Events message"""
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event_type}\n".encode("utf-8") + b"data: " + dumps(data) + b"\n\n"
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
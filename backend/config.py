@@ -23,19 +23,65 @@ class Settings(BaseSettings):
     azure_openai_api_version: str = "2024-12-01-preview"
     azure_openai_embeddings_deployment_name: str = "text-embedding-ada-002"
 
+    # Latency of the offline "synthetic" provider used by load tests
+    synthetic_llm_latency_ms: float = 500
+
     # Application Settings
     log_level: str = "INFO"
     summary_max_chars: int = 4000
     debug: bool = False
     allowed_hosts: str = "localhost,127.0.0.1"
 
+    # Tracing and profiling (off by default)
+    slow_request_ms: float = 0
+    profile_requests: bool = False
+    profile_interval_ms: float = 5
+    profiles_dir: str = str(PROJECT_ROOT / "profiles")
+
     # Database
     database_path: str = str(PROJECT_ROOT / "emails.db")
+    db_max_workers: int = 4
+    response_cache_entries: int = 256
+
+    # Live updates (GET /api/events)
+    events_buffer_size: int = 1000
+    events_queue_size: int = 1000
+    events_heartbeat_seconds: float = 15
+    events_poll_seconds: float = 2
+    events_retry_ms: int = 3000
+
+    # Processor daemon
+    processor_interval_seconds: int = 300
+    processor_jitter: float = 0.1
+    processor_lock_path: str = str(PROJECT_ROOT / ".run_processor.lock")
+    token_refresh_margin_seconds: int = 300
+
+    # Summary job queue
+    summary_lease_seconds: int = 300
+    summary_max_attempts: int = 5
+    summary_retry_base_seconds: int = 60
+    summary_retry_max_seconds: int = 3600
+
+    # Daily digest overviews: regenerate once summaries stop arriving for the
+    # quiet period, or after max wait during a steady stream
+    digest_quiet_seconds: int = 120
+    digest_max_wait_seconds: int = 900
+    digest_overview_days: int = 7
+
+    # Retention (0 disables a step)
+    retention_body_days: int = 0
+    retention_archive_days: int = 0
+    archive_dir: str = str(PROJECT_ROOT / "archive")
 
     # Gmail OAuth
     gmail_credentials_path: str = str(PROJECT_ROOT / "credentials.json")
     gmail_token_path: str = str(PROJECT_ROOT / "token.json")
 
+    # Multiple accounts (comma-separated ids besides "default")
+    gmail_accounts: str = ""
+    gmail_tokens_dir: str = str(PROJECT_ROOT / "tokens")
+    shards_dir: str = str(PROJECT_ROOT / "shards")
+
     class Config:
         env_file = str(PROJECT_ROOT / ".env")
         env_file_encoding = "utf-8"
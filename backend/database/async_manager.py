@@ -0,0 +1,81 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import AsyncIterator, Iterable, List, Dict, Optional
+
+from backend.database.manager import DatabaseManager
+
+class AsyncDatabaseManager:
+    """Async facade over DatabaseManager.
+
+    Every call runs on a dedicated thread pool so SQLite I/O never blocks the
+    event loop and reads from concurrent requests are served in parallel.
+    """
+
+    def __init__(self, db_path: str = "emails.db", max_workers: int = 4, executor: Optional[ThreadPoolExecutor] = None):
+        self.sync = DatabaseManager(db_path)
+        self.db_path = db_path
+        # Shards can share one pool so thread count does not grow with accounts
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Carry the caller's context so DB spans attach to the request trace
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, partial(context.run, func, *args, **kwargs))
+
+    async def save_email(self, message_id: str, sender: str, subject: str, body: str, received_at: datetime) -> int:
+        """Save email to database, return email ID"""
+        return await self._run(self.sync.save_email, message_id, sender, subject, body, received_at)
+
+    async def save_summary(self, email_id: int, topic: str, key_points: str, action_required: str, raw_summary: str, provider: str):
+        """Save email summary to database"""
+        return await self._run(self.sync.save_summary, email_id, topic, key_points, action_required, raw_summary, provider)
+
+    async def get_emails_with_summaries(self, limit: int = 50) -> List[Dict]:
+        """Get emails with their summaries (list fields and preview only)"""
+        return await self._run(self.sync.get_emails_with_summaries, limit)
+
+    async def iter_emails_with_summaries(self, limit: int = 50, batch_size: int = 500) -> AsyncIterator[List[Dict]]:
+        """Stream list rows in batches, each batch read on the DB thread pool"""
+        batches = self.sync.iter_emails_with_summaries(limit, batch_size)
+        try:
+            while True:
+                batch = await self._run(next, batches, None)
+                if batch is None:
+                    break
+                yield batch
+        finally:
+            await self._run(batches.close)
+
+    async def get_email(self, email_id: int) -> Optional[Dict]:
+        """Get a single email with its full body and summary"""
+        return await self._run(self.sync.get_email, email_id)
+
+    async def get_stats(self) -> Dict:
+        """Get email statistics"""
+        return await self._run(self.sync.get_stats)
+
+    async def get_data_version(self) -> Dict:
+        """Get the write counter and the time of the last write"""
+        return await self._run(self.sync.get_data_version)
+
+    async def get_digest(self, day: str) -> Dict:
+        """Get the digest of emails received on a day (YYYY-MM-DD)"""
+        return await self._run(self.sync.get_digest, day)
+
+    async def get_cluster_summary(self, email_id: int) -> Optional[Dict]:
+        """Find a summary of another email in the same near-duplicate cluster"""
+        return await self._run(self.sync.get_cluster_summary, email_id)
+
+    async def bulk_insert_emails(self, emails: Iterable[Dict], batch_size: int = 5000) -> int:
+        """Insert new emails in batched transactions, return how many"""
+        return await self._run(self.sync.bulk_insert_emails, emails, batch_size)
+
+    def close(self):
+        """Shut down the database thread pool if this manager created it"""
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
@@ -1,7 +1,66 @@
+import functools
+import itertools
 import sqlite3
 import os
+import re
+import time
+import zlib
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterable, Iterator, List, Dict, Optional
+
+from backend.database.migrations import apply_migrations
+from backend.digest import add_to_digests, read_digest, rebuild_digest
+from backend.dedup import MAX_DISTANCE, bands, can_reuse, distance, fingerprint, to_signed, to_unsigned
+from backend.metrics import DB_OPERATION_SECONDS, timed_operation
+from backend.tracing import span
+
+PREVIEW_CHARS = 200
+BODY_CODEC = 'zlib'
+
+def compress_body(body: str) -> bytes:
+    """Compress an email body for storage in email_bodies"""
+    return zlib.compress((body or '').encode('utf-8'), 6)
+
+def decompress_body(blob: Optional[bytes], codec: str = BODY_CODEC) -> str:
+    """Decompress an email body read from email_bodies"""
+    if blob is None:
+        return ''
+    if codec == 'zlib':
+        return zlib.decompress(blob).decode('utf-8')
+    if codec == 'plain':
+        return blob.decode('utf-8') if isinstance(blob, bytes) else blob
+    raise ValueError(f"Unknown body codec: {codec}")
+
+def make_preview(body: str, length: int = PREVIEW_CHARS) -> str:
+    """Collapse whitespace and truncate a body into a short list preview"""
+    text = re.sub(r'\s+', ' ', body or '').strip()
+    return text if len(text) <= length else text[:length].rstrip() + '…'
+
+def instrumented(func):
+    """Record a DatabaseManager method in the metrics and the active trace"""
+    timed = timed_operation(DB_OPERATION_SECONDS)(func)
+    span_name = f"db.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with span(span_name):
+            return timed(*args, **kwargs)
+    return wrapper
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def bump_data_version(cursor):
+    """Record a write; must run inside the writing transaction"""
+    cursor.execute(
+        'UPDATE data_version SET version = version + 1, updated_at = ? WHERE id = 1',
+        (time.time(),)
+    )
 
 class DatabaseManager:
     def __init__(self, db_path: str = "emails.db"):
@@ -9,65 +68,78 @@ class DatabaseManager:
         self.init_database()
 
     def init_database(self):
-        """Initialize database with required tables"""
+        """Initialize database and apply pending schema migrations"""
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
 
-        # Create emails table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS emails (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                message_id TEXT UNIQUE NOT NULL,
-                sender TEXT NOT NULL,
-                subject TEXT,
-                body TEXT,
-                received_at DATETIME,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Create summaries table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS summaries (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email_id INTEGER,
-                topic TEXT,
-                key_points TEXT,
-                action_required TEXT,
-                raw_summary TEXT,
-                provider TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (email_id) REFERENCES emails (id)
-            )
-        ''')
+        try:
+            # New files get incremental auto-vacuum before any table exists
+            if not conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone():
+                conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
 
-        # Create user preferences table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_preferences (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                provider TEXT DEFAULT 'gemini',
-                hours_to_fetch INTEGER DEFAULT 24,
-                auto_summarize BOOLEAN DEFAULT TRUE,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+            # WAL lets readers proceed while a fetch job is writing
+            conn.execute('PRAGMA journal_mode=WAL')
 
-        conn.commit()
-        conn.close()
+            self.schema_version = apply_migrations(conn)
+        finally:
+            conn.close()
 
+    @instrumented
     def save_email(self, message_id: str, sender: str, subject: str, body: str, received_at: datetime) -> int:
         """Save email to database, return email ID"""
+        simhash = fingerprint(body)
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
         try:
+            conn.execute('BEGIN IMMEDIATE')
+            cursor.execute(
+                'SELECT sender, subject, DATE(received_at) FROM emails WHERE message_id = ?', (message_id,))
+            previous = cursor.fetchone()
+
+            # Upsert keeps the row id stable so existing summaries stay attached
             cursor.execute('''
-                INSERT OR REPLACE INTO emails (message_id, sender, subject, body, received_at)
+                INSERT INTO emails (message_id, sender, subject, preview, received_at)
                 VALUES (?, ?, ?, ?, ?)
-            ''', (message_id, sender, subject, body, received_at))
+                ON CONFLICT(message_id) DO UPDATE SET
+                    sender = excluded.sender,
+                    subject = excluded.subject,
+                    preview = excluded.preview,
+                    received_at = excluded.received_at
+            ''', (message_id, sender, subject, make_preview(body), received_at))
+
+            cursor.execute('SELECT id, simhash, DATE(received_at) FROM emails WHERE message_id = ?', (message_id,))
+            email_id, stored_simhash, day = cursor.fetchone()
+
+            now = time.time()
+            if previous is None:
+                add_to_digests(cursor, [{
+                    'day': day, 'email_id': email_id, 'sender': sender, 'subject': subject,
+                    'received_at': received_at, 'new_email': True, 'summary': None,
+                }], now)
+            elif previous != (sender, subject, day):
+                # Re-fetched with different headers: recount the days it left and joined
+                for changed_day in {previous[2], day} - {None}:
+                    rebuild_digest(cursor, changed_day, now)
+
+            if simhash is not None and stored_simhash != to_signed(simhash):
+                cursor.execute(
+                    'UPDATE emails SET simhash = ?, cluster_id = ? WHERE id = ?',
+                    (to_signed(simhash), self._assign_cluster(cursor, email_id, simhash), email_id)
+                )
+
+            cursor.execute('''
+                INSERT OR REPLACE INTO email_bodies (email_id, codec, body)
+                VALUES (?, ?, ?)
+            ''', (email_id, BODY_CODEC, compress_body(body)))
 
-            email_id = cursor.lastrowid
+            # Queue the summary in the same transaction so no saved email is lost
+            if (body or '').strip():
+                cursor.execute('''
+                    INSERT OR IGNORE INTO summary_jobs (email_id, state, next_attempt_at, updated_at)
+                    VALUES (?, 'pending', 0, ?)
+                ''', (email_id, now))
+
+            bump_data_version(cursor)
             conn.commit()
             return email_id
         except Exception as e:
@@ -76,63 +148,618 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    @instrumented
     def save_summary(self, email_id: int, topic: str, key_points: str, action_required: str, raw_summary: str, provider: str):
         """Save email summary to database"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
         try:
-            cursor.execute('''
-                INSERT OR REPLACE INTO summaries (email_id, topic, key_points, action_required, raw_summary, provider)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (email_id, topic, key_points, action_required, raw_summary, provider))
+            conn.execute('BEGIN IMMEDIATE')
+            self._insert_summary(cursor, email_id, topic, key_points, action_required, raw_summary, provider)
+            self._finish_job(cursor, email_id)
+
+            bump_data_version(cursor)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+
+    @instrumented
+    def bulk_insert_emails(self, emails: Iterable[Dict], batch_size: int = 5000) -> int:
+        """Insert new emails (with an optional 'summary' dict each) in batched transactions
+
+        Meant for loading test and benchmark data: message ids must not exist
+        yet. Row ids are assigned up front so each table gets one executemany
+        per batch. Returns the number of emails inserted.
+        """
+        conn = sqlite3.connect(self.db_path)
+        total = 0
+
+        try:
+            for batch in _batched(emails, batch_size):
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    next_id = conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM emails').fetchone()[0]
+                    now = time.time()
+                    email_rows, body_rows, summary_rows, job_rows = [], [], [], []
+
+                    for email_id, email in enumerate(batch, start=next_id):
+                        body = email['body']
+                        simhash = fingerprint(body)
+                        cluster_id = self._assign_cluster(conn, email_id, simhash) if simhash is not None else None
+                        email_rows.append((email_id, email['message_id'], email['sender'], email['subject'],
+                                           make_preview(body), email['received_at'],
+                                           to_signed(simhash) if simhash is not None else None, cluster_id))
+                        body_rows.append((email_id, BODY_CODEC, compress_body(body)))
+
+                        summary = email.get('summary')
+                        if summary:
+                            summary_rows.append((email_id, summary['topic'], summary['key_points'],
+                                                 summary['action_required'], summary['raw_summary'],
+                                                 summary['provider']))
+                            job_rows.append((email_id, 'done', now))
+                        elif body.strip():
+                            job_rows.append((email_id, 'pending', now))
+
+                    conn.executemany('''
+                        INSERT INTO emails (id, message_id, sender, subject, preview, received_at, simhash, cluster_id)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', email_rows)
+                    conn.executemany(
+                        'INSERT INTO email_bodies (email_id, codec, body) VALUES (?, ?, ?)', body_rows)
+                    conn.executemany('''
+                        INSERT INTO summaries (email_id, topic, key_points, action_required, raw_summary, provider)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', summary_rows)
+                    conn.executemany('''
+                        INSERT OR REPLACE INTO summary_jobs (email_id, state, next_attempt_at, updated_at)
+                        VALUES (?, ?, 0, ?)
+                    ''', job_rows)
+
+                    # Days as SQLite computes them, so they match rebuild_digest
+                    days = dict(conn.execute(
+                        'SELECT id, DATE(received_at) FROM emails WHERE id >= ? AND id < ?',
+                        (next_id, next_id + len(batch))
+                    ))
+                    add_to_digests(conn, ({
+                        'day': days[email_id], 'email_id': email_id, 'sender': email['sender'],
+                        'subject': email['subject'], 'received_at': email['received_at'], 'new_email': True,
+                        'summary': email.get('summary') or None,
+                    } for email_id, email in enumerate(batch, start=next_id)), now)
+
+                    bump_data_version(conn.cursor())
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                total += len(batch)
+
+            return total
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _nearest_cluster(cursor, simhash: int) -> Optional[int]:
+        """Cluster whose fingerprint is nearest to simhash within MAX_DISTANCE, if any"""
+        candidates = cursor.execute('''
+            SELECT id, simhash FROM email_clusters
+            WHERE band0 = ? OR band1 = ? OR band2 = ? OR band3 = ? OR band4 = ?
+        ''', bands(simhash)).fetchall()
+
+        best_id, best_distance = None, MAX_DISTANCE + 1
+        for cluster_id, cluster_simhash in candidates:
+            d = distance(simhash, to_unsigned(cluster_simhash))
+            if d < best_distance:
+                best_id, best_distance = cluster_id, d
+        return best_id
+
+    @classmethod
+    def _assign_cluster(cls, cursor, email_id: int, simhash: int) -> int:
+        """Join the nearest cluster or start a new one with this email as its fingerprint"""
+        cluster_id = cls._nearest_cluster(cursor, simhash)
+        if cluster_id is not None:
+            return cluster_id
+
+        return cursor.execute('''
+            INSERT INTO email_clusters (email_id, simhash, band0, band1, band2, band3, band4, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (email_id, to_signed(simhash)) + bands(simhash) + (time.time(),)).lastrowid
+
+    @instrumented
+    def find_cluster(self, body: str) -> Optional[int]:
+        """Look up the near-duplicate cluster a body would join, without indexing it"""
+        simhash = fingerprint(body)
+        if simhash is None:
+            return None
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return self._nearest_cluster(conn, simhash)
+        finally:
+            conn.close()
+
+    @instrumented
+    def index_near_duplicates(self, batch_size: int = 1000) -> Dict[str, int]:
+        """Fingerprint and cluster emails saved before the near-duplicate index existed"""
+        conn = sqlite3.connect(self.db_path)
+        result = {'indexed': 0, 'clusters': 0}
+        last_id = 0
+
+        try:
+            while True:
+                rows = conn.execute('''
+                    SELECT e.id, b.codec, b.body FROM emails e
+                    JOIN email_bodies b ON b.email_id = e.id
+                    WHERE e.simhash IS NULL AND e.id > ?
+                    ORDER BY e.id
+                    LIMIT ?
+                ''', (last_id, batch_size)).fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+
+                # Fingerprint outside the write lock, cluster inside it
+                simhashes = [(email_id, fingerprint(decompress_body(blob, codec or BODY_CODEC)))
+                             for email_id, codec, blob in rows]
+
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    clusters_before = conn.execute('SELECT COUNT(*) FROM email_clusters').fetchone()[0]
+                    for email_id, simhash in simhashes:
+                        if simhash is None:
+                            continue
+                        conn.execute(
+                            'UPDATE emails SET simhash = ?, cluster_id = ? WHERE id = ?',
+                            (to_signed(simhash), self._assign_cluster(conn, email_id, simhash), email_id)
+                        )
+                        result['indexed'] += 1
+                    result['clusters'] += conn.execute('SELECT COUNT(*) FROM email_clusters').fetchone()[0] - clusters_before
+                    bump_data_version(conn.cursor())
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+            return result
+        finally:
+            conn.close()
+
+    @instrumented
+    def get_cluster_summary(self, email_id: int) -> Optional[Dict]:
+        """Find a summary of a near-duplicate that can be reused for this email
+
+        Only summaries that pass backend.dedup.can_reuse qualify, not just any
+        in the cluster (clusters group emails for the UI). Returns the summary fields plus both subjects (for
+        adapting it, see backend.dedup.reuse_summary), or None.
+        """
+        conn = sqlite3.connect(self.db_path)
+
+        try:
+            target = conn.execute('''
+                SELECT e.sender, e.subject, e.simhash, e.cluster_id, b.codec, b.body
+                FROM emails e LEFT JOIN email_bodies b ON b.email_id = e.id
+                WHERE e.id = ?
+            ''', (email_id,)).fetchone()
+            if not target or target[2] is None or target[3] is None:
+                return None
+            sender, subject, simhash, cluster_id, codec, blob = target
+            simhash = to_unsigned(simhash)
+            target = {'sender': sender, 'subject': subject, 'body': decompress_body(blob, codec or BODY_CODEC)}
+
+            # The earliest summary is preferred: it is usually the original LLM output
+            candidates = conn.execute('''
+                SELECT src.id, src.subject, src.simhash, s.topic, s.key_points, s.action_required, s.provider
+                FROM emails src
+                JOIN summaries s ON s.email_id = src.id
+                WHERE src.cluster_id = ? AND src.id != ? AND src.sender = ? AND src.simhash IS NOT NULL
+                ORDER BY s.id
+                LIMIT 500
+            ''', (cluster_id, email_id, sender)).fetchall()
+
+            for source_id, source_subject, source_simhash, topic, key_points, action_required, provider in candidates:
+                # Cheap check first; bodies are only read for close fingerprints
+                if distance(to_unsigned(source_simhash), simhash) > MAX_DISTANCE:
+                    continue
+                row = conn.execute(
+                    'SELECT codec, body FROM email_bodies WHERE email_id = ?', (source_id,)).fetchone()
+                source = {'sender': sender, 'subject': source_subject,
+                          'body': decompress_body(row[1], row[0] or BODY_CODEC) if row else ''}
+                if can_reuse(source, target):
+                    return {
+                        'topic': topic,
+                        'key_points': key_points,
+                        'action_required': action_required,
+                        'provider': provider,
+                        'source_email_id': source_id,
+                        'source_subject': source_subject,
+                        'subject': subject,
+                    }
+            return None
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _insert_summary(cursor, email_id: int, topic: str, key_points: str, action_required: str,
+                        raw_summary: str, provider: str):
+        """Write a summary and update its day's digest; run inside a write transaction"""
+        replacing = cursor.execute('SELECT 1 FROM summaries WHERE email_id = ? LIMIT 1', (email_id,)).fetchone()
+
+        cursor.execute('''
+            INSERT INTO summaries (email_id, topic, key_points, action_required, raw_summary, provider)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (email_id) DO UPDATE SET
+                topic = excluded.topic,
+                key_points = excluded.key_points,
+                action_required = excluded.action_required,
+                raw_summary = excluded.raw_summary,
+                provider = excluded.provider,
+                created_at = CURRENT_TIMESTAMP
+        ''', (email_id, topic, key_points, action_required, raw_summary, provider))
+
+        email = cursor.execute(
+            'SELECT sender, subject, received_at, DATE(received_at) FROM emails WHERE id = ?', (email_id,)
+        ).fetchone()
+        if not email or email[3] is None:
+            return
+
+        now = time.time()
+        if replacing:
+            # The day counted the old summary's topic and action
+            rebuild_digest(cursor, email[3], now, summaries_changed=True)
+        else:
+            add_to_digests(cursor, [{
+                'day': email[3], 'email_id': email_id, 'sender': email[0], 'subject': email[1],
+                'received_at': email[2], 'new_email': False,
+                'summary': {'topic': topic, 'action_required': action_required},
+            }], now)
+
+    @staticmethod
+    def _finish_job(cursor, email_id: int):
+        cursor.execute('''
+            INSERT INTO summary_jobs (email_id, state, next_attempt_at, updated_at)
+            VALUES (?, 'done', 0, ?)
+            ON CONFLICT(email_id) DO UPDATE SET
+                state = 'done',
+                lease_owner = NULL,
+                lease_expires_at = NULL,
+                last_error = NULL,
+                updated_at = excluded.updated_at
+        ''', (email_id, time.time()))
+
+    @instrumented
+    def claim_summary_jobs(self, worker_id: str, limit: int = 10, lease_seconds: int = 300,
+                           max_attempts: int = 5) -> List[Dict]:
+        """Atomically lease up to `limit` jobs that are due, return them with their bodies
+
+        Due jobs are pending ones, failed ones whose retry time has passed and
+        in-progress ones whose lease expired (their worker died). Each claim
+        counts as an attempt, so a job that keeps crashing or hanging its
+        worker ends up failed like any other once it is out of attempts.
+        """
+        conn = sqlite3.connect(self.db_path)
+        now = time.time()
+
+        try:
+            # BEGIN IMMEDIATE takes the write lock up front, so two workers never lease the same job
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('''
+                UPDATE summary_jobs
+                SET state = 'failed', last_error = 'lease expired', next_attempt_at = ?,
+                    lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+                WHERE state = 'in_progress' AND lease_expires_at < ? AND attempts >= ?
+            ''', (now, now, now, max_attempts))
+            rows = conn.execute('''
+                SELECT j.email_id, j.attempts, b.codec, b.body
+                FROM summary_jobs j
+                LEFT JOIN email_bodies b ON b.email_id = j.email_id
+                WHERE (j.state = 'pending' AND j.next_attempt_at <= ?)
+                   OR (j.state = 'failed' AND j.next_attempt_at <= ? AND j.attempts < ?)
+                   OR (j.state = 'in_progress' AND j.lease_expires_at < ? AND j.attempts < ?)
+                ORDER BY j.next_attempt_at, j.email_id
+                LIMIT ?
+            ''', (now, now, max_attempts, now, max_attempts, limit)).fetchall()
+
+            conn.executemany('''
+                UPDATE summary_jobs
+                SET state = 'in_progress', attempts = attempts + 1,
+                    lease_owner = ?, lease_expires_at = ?, updated_at = ?
+                WHERE email_id = ?
+            ''', [(worker_id, now + lease_seconds, now, row[0]) for row in rows])
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+
+        return [
+            {'email_id': row[0], 'attempts': row[1] + 1, 'body': decompress_body(row[3], row[2] or BODY_CODEC)}
+            for row in rows
+        ]
+
+    @instrumented
+    def complete_summary_job(self, email_id: int, worker_id: str, summary: Optional[Dict] = None) -> bool:
+        """Save a job's summary and mark it done, return False if the lease was lost
+
+        ``summary`` is None for emails with nothing to summarize.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            cursor.execute(
+                "SELECT 1 FROM summary_jobs WHERE email_id = ? AND state = 'in_progress' AND lease_owner = ?",
+                (email_id, worker_id)
+            )
+            if not cursor.fetchone():
+                conn.rollback()
+                return False
+
+            if summary is not None:
+                self._insert_summary(cursor, email_id, summary['topic'], summary['key_points'],
+                                     summary['action_required'], summary['raw_summary'], summary['provider'])
+                bump_data_version(cursor)
+            self._finish_job(cursor, email_id)
 
             conn.commit()
+            return True
         except Exception as e:
             conn.rollback()
             raise e
         finally:
             conn.close()
 
+    @instrumented
+    def fail_summary_job(self, email_id: int, worker_id: str, error: str, retry_at: float) -> bool:
+        """Record a failed attempt and when to retry it, return False if the lease was lost"""
+        conn = sqlite3.connect(self.db_path)
+
+        try:
+            cursor = conn.execute('''
+                UPDATE summary_jobs
+                SET state = 'failed', next_attempt_at = ?, last_error = ?,
+                    lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+                WHERE email_id = ? AND state = 'in_progress' AND lease_owner = ?
+            ''', (retry_at, error[:1000], time.time(), email_id, worker_id))
+            conn.commit()
+            return cursor.rowcount > 0
+        finally:
+            conn.close()
+
+    @instrumented
+    def redrive_failed_jobs(self) -> int:
+        """Reset failed jobs to pending with a fresh attempt budget, return how many"""
+        conn = sqlite3.connect(self.db_path)
+
+        try:
+            cursor = conn.execute('''
+                UPDATE summary_jobs
+                SET state = 'pending', attempts = 0, next_attempt_at = 0, updated_at = ?
+                WHERE state = 'failed'
+            ''', (time.time(),))
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    @instrumented
+    def get_job_counts(self, max_attempts: int = 5) -> Dict[str, int]:
+        """Count summary jobs per state; failed jobs out of attempts are reported as exhausted"""
+        conn = sqlite3.connect(self.db_path)
+
+        try:
+            rows = conn.execute('''
+                SELECT CASE WHEN state = 'failed' AND attempts >= ? THEN 'exhausted' ELSE state END,
+                       COUNT(*)
+                FROM summary_jobs
+                GROUP BY 1
+            ''', (max_attempts,)).fetchall()
+        finally:
+            conn.close()
+
+        counts = {'pending': 0, 'in_progress': 0, 'done': 0, 'failed': 0, 'exhausted': 0}
+        counts.update(dict(rows))
+        return counts
+
+    LIST_QUERY = '''
+        SELECT
+            e.id, e.message_id, e.sender, e.subject, e.preview, e.received_at, e.created_at,
+            s.topic, s.key_points, s.action_required, s.provider, e.cluster_id
+        FROM emails e
+        LEFT JOIN summaries s ON e.id = s.email_id
+        ORDER BY e.received_at DESC
+        LIMIT ?
+    '''
+
+    @staticmethod
+    def _list_row(row) -> Dict:
+        return {
+            'id': row[0],
+            'message_id': row[1],
+            'sender': row[2],
+            'subject': row[3],
+            'preview': row[4],
+            'received_at': row[5],
+            'created_at': row[6],
+            'cluster_id': row[11],
+            'summary': {
+                'topic': row[7],
+                'key_points': row[8],
+                'action_required': row[9],
+                'provider': row[10]
+            } if row[7] else None
+        }
+
+    @instrumented
     def get_emails_with_summaries(self, limit: int = 50) -> List[Dict]:
-        """Get emails with their summaries"""
+        """Get emails with their summaries (list fields and preview only)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute(self.LIST_QUERY, (limit,))
+
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [self._list_row(row) for row in rows]
+
+    def iter_emails_with_summaries(self, limit: int = 50, batch_size: int = 500) -> Iterator[List[Dict]]:
+        """Yield list rows in batches straight from the cursor
+
+        Memory stays bounded by batch_size regardless of limit. The connection
+        may be driven from several threads (one batch at a time) and is closed
+        when the generator finishes or is closed.
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+
+        try:
+            cursor = conn.execute(self.LIST_QUERY, (limit,))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [self._list_row(row) for row in rows]
+        finally:
+            conn.close()
+
+    @instrumented
+    def get_email(self, email_id: int) -> Optional[Dict]:
+        """Get a single email with its full body and summary"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
         cursor.execute('''
             SELECT
-                e.id, e.message_id, e.sender, e.subject, e.body, e.received_at, e.created_at,
-                s.topic, s.key_points, s.action_required, s.raw_summary, s.provider
+                e.id, e.message_id, e.sender, e.subject, e.received_at, e.created_at,
+                b.codec, b.body,
+                s.topic, s.key_points, s.action_required, s.raw_summary, s.provider, e.cluster_id
             FROM emails e
+            LEFT JOIN email_bodies b ON e.id = b.email_id
             LEFT JOIN summaries s ON e.id = s.email_id
-            ORDER BY e.received_at DESC
-            LIMIT ?
-        ''', (limit,))
+            WHERE e.id = ?
+            ORDER BY s.id DESC
+            LIMIT 1
+        ''', (email_id,))
 
-        rows = cursor.fetchall()
+        row = cursor.fetchone()
         conn.close()
 
-        emails = []
-        for row in rows:
-            emails.append({
-                'id': row[0],
-                'message_id': row[1],
-                'sender': row[2],
-                'subject': row[3],
-                'body': row[4],
-                'received_at': row[5],
-                'created_at': row[6],
-                'summary': {
-                    'topic': row[7],
-                    'key_points': row[8],
-                    'action_required': row[9],
-                    'raw_summary': row[10],
-                    'provider': row[11]
-                } if row[7] else None
-            })
-
-        return emails
+        if not row:
+            return None
+
+        return {
+            'id': row[0],
+            'message_id': row[1],
+            'sender': row[2],
+            'subject': row[3],
+            'body': decompress_body(row[7], row[6] or BODY_CODEC),
+            'received_at': row[4],
+            'created_at': row[5],
+            'cluster_id': row[13],
+            'summary': {
+                'topic': row[8],
+                'key_points': row[9],
+                'action_required': row[10],
+                'raw_summary': row[11],
+                'provider': row[12]
+            } if row[8] else None
+        }
+
+    @instrumented
+    def get_digest(self, day: str) -> Dict:
+        """Get the digest of emails received on a day (YYYY-MM-DD)"""
+        conn = sqlite3.connect(self.db_path)
+
+        try:
+            return read_digest(conn, day)
+        finally:
+            conn.close()
+
+    @instrumented
+    def get_due_digests(self, quiet_seconds: float, max_wait_seconds: float, since: str) -> List[str]:
+        """Days from `since` on whose overview is due for regeneration
+
+        An overview is due once no summary has arrived for `quiet_seconds`,
+        or once it has been pending for `max_wait_seconds`, so a burst of
+        mail triggers one regeneration and a steady trickle cannot postpone
+        it forever.
+        """
+        conn = sqlite3.connect(self.db_path)
+        now = time.time()
+
+        try:
+            rows = conn.execute('''
+                SELECT day FROM daily_digests
+                WHERE day >= ? AND overview_pending_since IS NOT NULL
+                  AND (summaries_changed_at <= ? OR overview_pending_since <= ?)
+                ORDER BY day DESC
+            ''', (since, now - quiet_seconds, now - max_wait_seconds)).fetchall()
+            return [row[0] for row in rows]
+        finally:
+            conn.close()
+
+    @instrumented
+    def save_digest_overview(self, day: str, overview: str, provider: str, covers_until: Optional[float]) -> bool:
+        """Store a day's overview, return False if the day has no digest
 
+        ``covers_until`` is the day's summaries_changed_at when the overview
+        was generated; summaries that arrived after it keep the overview
+        pending.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                UPDATE daily_digests
+                SET overview = ?, overview_provider = ?, overview_generated_at = ?,
+                    overview_pending_since = CASE
+                        WHEN summaries_changed_at > COALESCE(?, 0) THEN summaries_changed_at
+                    END
+                WHERE day = ?
+            ''', (overview, provider, time.time(), covers_until, day))
+            updated = cursor.rowcount > 0
+
+            if updated:
+                bump_data_version(cursor)
+            conn.commit()
+            return updated
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+
+    @instrumented
+    def rebuild_digests(self) -> int:
+        """Recompute every day's digest counts from its emails, return the number of days"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            days = {row[0] for row in cursor.execute(
+                'SELECT DISTINCT DATE(received_at) FROM emails WHERE received_at IS NOT NULL') if row[0]}
+            days.update(row[0] for row in cursor.execute('SELECT day FROM daily_digests').fetchall())
+
+            now = time.time()
+            for day in sorted(days):
+                rebuild_digest(cursor, day, now)
+
+            bump_data_version(cursor)
+            conn.commit()
+            return len(days)
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+
+    @instrumented
     def get_stats(self) -> Dict:
         """Get email statistics"""
         conn = sqlite3.connect(self.db_path)
@@ -158,3 +785,146 @@ class DatabaseManager:
             'today_emails': today_emails,
             'summary_rate': round((total_summaries / total_emails * 100) if total_emails > 0 else 0, 2)
         }
+
+    @instrumented
+    def get_data_version(self) -> Dict:
+        """Get the write counter and the time of the last write"""
+        conn = sqlite3.connect(self.db_path)
+
+        try:
+            row = conn.execute('SELECT version, updated_at FROM data_version WHERE id = 1').fetchone()
+            return {'version': row[0], 'updated_at': row[1]}
+        finally:
+            conn.close()
+
+    @instrumented
+    def purge_bodies(self, older_than: datetime) -> int:
+        """Drop bodies and raw summaries of emails received before a cutoff, keep parsed summaries"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                DELETE FROM email_bodies
+                WHERE email_id IN (SELECT id FROM emails WHERE received_at < ?)
+            ''', (older_than,))
+            purged = cursor.rowcount
+
+            cursor.execute('''
+                UPDATE summaries SET raw_summary = NULL
+                WHERE raw_summary IS NOT NULL
+                  AND email_id IN (SELECT id FROM emails WHERE received_at < ?)
+            ''', (older_than,))
+
+            if purged:
+                bump_data_version(cursor)
+            conn.commit()
+            return purged
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+
+    @instrumented
+    def archive_emails(self, older_than: datetime, archive_dir: str) -> Dict[str, int]:
+        """Move emails received before a cutoff into monthly archive databases
+
+        Returns the number of emails archived per month (YYYY-MM).
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT DISTINCT strftime('%Y-%m', received_at) FROM emails
+            WHERE received_at < ?
+        ''', (older_than,))
+        months = [row[0] for row in cursor.fetchall() if row[0]]
+
+        archived = {}
+        try:
+            for month in months:
+                archive_path = os.path.join(archive_dir, f"emails-{month}.db")
+                os.makedirs(archive_dir, exist_ok=True)
+                DatabaseManager(archive_path)
+
+                selection = "SELECT id FROM emails WHERE received_at < ? AND strftime('%Y-%m', received_at) = ?"
+                params = (older_than, month)
+
+                cursor.execute('ATTACH DATABASE ? AS archive', (archive_path,))
+                try:
+                    cursor.execute(f'SELECT DISTINCT DATE(received_at) FROM emails WHERE id IN ({selection})', params)
+                    days = [row[0] for row in cursor.fetchall() if row[0]]
+
+                    cursor.execute(f'''
+                        INSERT OR REPLACE INTO archive.emails
+                            (id, message_id, sender, subject, preview, received_at, created_at)
+                        SELECT id, message_id, sender, subject, preview, received_at, created_at
+                        FROM emails WHERE id IN ({selection})
+                    ''', params)
+                    count = cursor.rowcount
+
+                    cursor.execute(f'''
+                        INSERT OR REPLACE INTO archive.email_bodies (email_id, codec, body)
+                        SELECT email_id, codec, body FROM email_bodies
+                        WHERE email_id IN ({selection})
+                    ''', params)
+
+                    cursor.execute(f'''
+                        INSERT OR REPLACE INTO archive.summaries
+                            (id, email_id, topic, key_points, action_required, raw_summary, provider, created_at)
+                        SELECT id, email_id, topic, key_points, action_required, raw_summary, provider, created_at
+                        FROM summaries WHERE email_id IN ({selection})
+                    ''', params)
+
+                    cursor.execute(f'DELETE FROM email_bodies WHERE email_id IN ({selection})', params)
+                    cursor.execute(f'DELETE FROM summaries WHERE email_id IN ({selection})', params)
+                    cursor.execute(f'DELETE FROM summary_jobs WHERE email_id IN ({selection})', params)
+
+                    # Clusters founded by archived emails go with them unless members remain,
+                    # which keep the fingerprint under the earliest remaining member
+                    cursor.execute(f'''
+                        DELETE FROM email_clusters
+                        WHERE email_id IN ({selection}) AND NOT EXISTS (
+                            SELECT 1 FROM emails e WHERE e.cluster_id = email_clusters.id AND e.id NOT IN ({selection})
+                        )
+                    ''', params * 2)
+                    cursor.execute(f'''
+                        UPDATE email_clusters SET email_id = (
+                            SELECT MIN(e.id) FROM emails e WHERE e.cluster_id = email_clusters.id AND e.id NOT IN ({selection})
+                        )
+                        WHERE email_id IN ({selection})
+                    ''', params * 2)
+
+                    cursor.execute(f'DELETE FROM emails WHERE id IN ({selection})', params)
+
+                    now = time.time()
+                    for day in days:
+                        rebuild_digest(cursor, day, now)
+
+                    bump_data_version(cursor)
+                    conn.commit()
+                    archived[month] = count
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    cursor.execute('DETACH DATABASE archive')
+
+            return archived
+        finally:
+            conn.close()
+
+    @instrumented
+    def incremental_vacuum(self) -> int:
+        """Return free pages to the filesystem, return the number of pages released"""
+        conn = sqlite3.connect(self.db_path)
+
+        try:
+            free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            # The pragma frees one page per step and sqlite3's execute() steps it only once
+            conn.executescript('PRAGMA incremental_vacuum;')
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+            return free_pages - conn.execute('PRAGMA freelist_count').fetchone()[0]
+        finally:
+            conn.close()
@@ -0,0 +1,288 @@
+"""Versioned schema migrations for the InboxPrism SQLite database.
+
+The applied version is stored in ``PRAGMA user_version``. Each migration runs
+once, in order, inside its own transaction, so an interrupted upgrade leaves
+the database at the last fully applied version. Migrations must stay
+idempotent because databases created before versioning report version 0.
+"""
+
+import logging
+import sqlite3
+import time
+from typing import Callable, List, NamedTuple
+
+from backend.digest import rebuild_digest
+
+logger = logging.getLogger(__name__)
+
+# Inline bodies moved per query by the compressed-bodies migration
+BODY_BATCH_SIZE = 1000
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+    transactional: bool = True
+
+def _baseline_schema(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS emails (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id TEXT UNIQUE NOT NULL,
+            sender TEXT NOT NULL,
+            subject TEXT,
+            body TEXT,
+            received_at DATETIME,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS summaries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email_id INTEGER,
+            topic TEXT,
+            key_points TEXT,
+            action_required TEXT,
+            raw_summary TEXT,
+            provider TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (email_id) REFERENCES emails (id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS user_preferences (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            provider TEXT DEFAULT 'gemini',
+            hours_to_fetch INTEGER DEFAULT 24,
+            auto_summarize BOOLEAN DEFAULT TRUE,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def _compressed_bodies(conn: sqlite3.Connection):
+    from backend.database.manager import BODY_CODEC, compress_body, make_preview
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS email_bodies (
+            email_id INTEGER PRIMARY KEY,
+            codec TEXT NOT NULL DEFAULT 'zlib',
+            body BLOB,
+            FOREIGN KEY (email_id) REFERENCES emails (id)
+        )
+    ''')
+
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(emails)')]
+    if 'preview' not in columns:
+        conn.execute('ALTER TABLE emails ADD COLUMN preview TEXT')
+
+    # Move bodies still stored inline in emails.body, a batch at a time so large inboxes fit in memory
+    last_id = 0
+    while True:
+        rows = conn.execute('''
+            SELECT id, body FROM emails
+            WHERE body IS NOT NULL AND id > ?
+            ORDER BY id
+            LIMIT ?
+        ''', (last_id, BODY_BATCH_SIZE)).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        conn.executemany('''
+            INSERT OR REPLACE INTO email_bodies (email_id, codec, body)
+            VALUES (?, ?, ?)
+        ''', [(email_id, BODY_CODEC, compress_body(body)) for email_id, body in rows])
+        conn.executemany(
+            'UPDATE emails SET body = NULL, preview = ? WHERE id = ?',
+            [(make_preview(body), email_id) for email_id, body in rows]
+        )
+
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_emails_received_at ON emails (received_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_summaries_email_id ON summaries (email_id)')
+
+def _incremental_auto_vacuum(conn: sqlite3.Connection):
+    # Changing auto_vacuum on an existing file only takes effect after VACUUM
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('VACUUM')
+
+def _data_version(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL
+        )
+    ''')
+    conn.execute(
+        'INSERT OR IGNORE INTO data_version (id, version, updated_at) VALUES (1, 0, ?)',
+        (time.time(),)
+    )
+
+def _summary_jobs(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS summary_jobs (
+            email_id INTEGER PRIMARY KEY,
+            state TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL DEFAULT 0,
+            lease_owner TEXT,
+            lease_expires_at REAL,
+            last_error TEXT,
+            updated_at REAL NOT NULL DEFAULT 0,
+            FOREIGN KEY (email_id) REFERENCES emails (id)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_summary_jobs_state ON summary_jobs (state, next_attempt_at)')
+
+    # Failures used to be stored as placeholder summaries; requeue those emails
+    conn.execute('''
+        DELETE FROM summaries
+        WHERE topic IN ('Error summarizing email', 'Summary failed')
+    ''')
+
+    now = time.time()
+    conn.execute('''
+        INSERT OR IGNORE INTO summary_jobs (email_id, state, next_attempt_at, updated_at)
+        SELECT e.id, 'done', 0, ? FROM emails e
+        WHERE EXISTS (SELECT 1 FROM summaries s WHERE s.email_id = e.id)
+    ''', (now,))
+    conn.execute('''
+        INSERT OR IGNORE INTO summary_jobs (email_id, state, next_attempt_at, updated_at)
+        SELECT e.email_id, 'pending', 0, ? FROM email_bodies e
+        WHERE e.body IS NOT NULL
+    ''', (now,))
+
+def _near_duplicate_index(conn: sqlite3.Connection):
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(emails)')]
+    if 'simhash' not in columns:
+        conn.execute('ALTER TABLE emails ADD COLUMN simhash INTEGER')
+    if 'cluster_id' not in columns:
+        conn.execute('ALTER TABLE emails ADD COLUMN cluster_id INTEGER')
+
+    # One row per cluster: the first email's fingerprint split into bands (see backend.dedup)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS email_clusters (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email_id INTEGER NOT NULL,
+            simhash INTEGER NOT NULL,
+            band0 INTEGER NOT NULL,
+            band1 INTEGER NOT NULL,
+            band2 INTEGER NOT NULL,
+            band3 INTEGER NOT NULL,
+            band4 INTEGER NOT NULL,
+            created_at REAL NOT NULL
+        )
+    ''')
+    for band in range(5):
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_email_clusters_band{band} ON email_clusters (band{band})')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_emails_cluster_id ON emails (cluster_id)')
+
+def _daily_digests(conn: sqlite3.Connection):
+    # One row per received date, see backend.digest
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS daily_digests (
+            day TEXT PRIMARY KEY,
+            email_count INTEGER NOT NULL DEFAULT 0,
+            summary_count INTEGER NOT NULL DEFAULT 0,
+            action_count INTEGER NOT NULL DEFAULT 0,
+            senders TEXT NOT NULL DEFAULT '{}',
+            topics TEXT NOT NULL DEFAULT '{}',
+            actions TEXT NOT NULL DEFAULT '[]',
+            updated_at REAL,
+            summaries_changed_at REAL,
+            overview TEXT,
+            overview_provider TEXT,
+            overview_generated_at REAL,
+            overview_pending_since REAL
+        )
+    ''')
+
+    # Backfill counts only; overviews for past days are generated on request (run_processor.py digest)
+    now = time.time()
+    days = conn.execute('SELECT DISTINCT DATE(received_at) FROM emails WHERE received_at IS NOT NULL').fetchall()
+    for (day,) in days:
+        if day:
+            rebuild_digest(conn, day, now)
+
+def _unique_summaries(conn: sqlite3.Connection):
+    # Re-summarizing used to add a row per run; keep the latest one, which readers already picked
+    days = conn.execute('''
+        SELECT DISTINCT DATE(e.received_at) FROM emails e
+        WHERE e.id IN (SELECT email_id FROM summaries GROUP BY email_id HAVING COUNT(*) > 1)
+    ''').fetchall()
+    conn.execute('''
+        DELETE FROM summaries
+        WHERE id NOT IN (SELECT MAX(id) FROM summaries GROUP BY email_id)
+    ''')
+    conn.execute('DROP INDEX IF EXISTS idx_summaries_email_id')
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_summaries_email_id ON summaries (email_id)')
+
+    # Digests backfilled by the previous migration counted every copy
+    now = time.time()
+    for (day,) in days:
+        if day:
+            rebuild_digest(conn, day, now)
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'baseline schema', _baseline_schema),
+    Migration(2, 'compressed email bodies and list indexes', _compressed_bodies),
+    Migration(3, 'incremental auto-vacuum', _incremental_auto_vacuum, transactional=False),
+    Migration(4, 'data version counter', _data_version),
+    Migration(5, 'summary job queue', _summary_jobs),
+    Migration(6, 'near-duplicate index', _near_duplicate_index),
+    Migration(7, 'daily digests', _daily_digests),
+    Migration(8, 'one summary per email', _unique_summaries),
+]
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """Apply all pending migrations, return the resulting schema version
+
+    The API and run_processor may open an unmigrated database at the same
+    time, so the version is re-read once the write lock is held and
+    migrations the other process applied meanwhile are skipped.
+    """
+    current = get_schema_version(conn)
+
+    for migration in MIGRATIONS:
+        if migration.version <= current:
+            continue
+
+        if migration.transactional:
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                current = get_schema_version(conn)
+                if migration.version <= current:
+                    conn.rollback()
+                    continue
+
+                logger.info(f"Applying schema migration {migration.version}: {migration.description}")
+                migration.apply(conn)
+                conn.execute(f'PRAGMA user_version = {migration.version}')
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        else:
+            # Cannot run inside a transaction (VACUUM), so it must stay idempotent
+            conn.commit()
+            current = get_schema_version(conn)
+            if migration.version <= current:
+                continue
+
+            logger.info(f"Applying schema migration {migration.version}: {migration.description}")
+            migration.apply(conn)
+            conn.execute('BEGIN IMMEDIATE')
+            if get_schema_version(conn) < migration.version:
+                conn.execute(f'PRAGMA user_version = {migration.version}')
+            conn.commit()
+
+        current = get_schema_version(conn)
+
+    return current
@@ -0,0 +1,36 @@
+import threading
+from typing import Any, Callable, Dict
+
+from backend.database.manager import DatabaseManager
+
+class ShardRegistry:
+    """Lazily opens one database manager per account shard.
+
+    Each mailbox lives in its own SQLite file, so writers for different
+    accounts never contend for the same lock and file sizes stay bounded.
+    """
+
+    def __init__(self, path_for: Callable[[str], str], factory: Callable[[str], Any] = DatabaseManager):
+        self.path_for = path_for
+        self.factory = factory
+        self._shards: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, account: str):
+        """Return the manager for an account's shard, creating it on first use"""
+        shard = self._shards.get(account)
+        if shard is None:
+            with self._lock:
+                shard = self._shards.get(account)
+                if shard is None:
+                    shard = self.factory(self.path_for(account))
+                    self._shards[account] = shard
+        return shard
+
+    def get_open(self, account: str):
+        """Return the manager for an account's shard if it is already open, else None"""
+        return self._shards.get(account)
+
+    def open_shards(self) -> Dict[str, Any]:
+        """Return the shards opened so far, keyed by account"""
+        return dict(self._shards)
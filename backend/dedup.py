@@ -0,0 +1,149 @@
+"""Near-duplicate detection with 64-bit SimHash.
+
+Bodies are normalised (lowercase, digits collapsed so order numbers and
+dates do not matter) and their distinct words folded into a SimHash.
+Emails whose fingerprints differ in at most MAX_DISTANCE bits are treated
+as near-duplicates. Splitting the fingerprint into MAX_DISTANCE + 1 bands
+guarantees such a pair shares at least one band exactly, so candidates are
+found with indexed equality lookups instead of a scan.
+
+Words rather than word n-grams are used as features: templated mail that
+differs in a name and a date changes two features instead of six, which
+keeps those pairs within MAX_DISTANCE on short bodies. Quoted thread history
+is stripped first, so a short reply does not inherit the fingerprint of the
+message it quotes.
+
+Clusters are loose enough to group emails in the UI, but too loose to copy
+summaries across: a changed amount or a "not" barely moves a fingerprint. A
+summary is only reused when ``can_reuse`` holds: same sender, neither email a
+reply, and bodies that match word for word apart from the greeting and the
+tokens that also differ between the subjects (which reuse_summary swaps).
+"""
+
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+
+from backend.metrics import REGISTRY
+
+SUMMARIES_REUSED = REGISTRY.counter(
+    'inboxprism_summaries_reused_total', 'Summaries copied from a near-duplicate instead of calling the LLM')
+
+MAX_DISTANCE = 4
+BAND_WIDTHS = (13, 13, 13, 13, 12)
+MIN_WORDS = 10
+
+_TOKEN = re.compile(r"[a-z#]+")
+_DIGITS = re.compile(r"\d+")
+_WORD = re.compile(r"\w+")
+# Where quoted history starts: "On <date>, <name> wrote:" or an Outlook separator
+_QUOTE_HEADER = re.compile(r"^\s*(on\b.{0,200}\bwrote:|-{2,}\s*original message\s*-{2,})\s*$", re.IGNORECASE)
+_REPLY_PREFIX = re.compile(r"^\s*(re|fwd?|aw|sv)\s*:", re.IGNORECASE)
+_GREETING = re.compile(r"^\s*(hi|hello|hey|dear)\b[^\n]{0,40}$", re.IGNORECASE)
+
+def strip_quoted(text: str) -> str:
+    """The part of a body written by its sender: quoted ("> ...") lines and history after "On ... wrote:" dropped"""
+    lines = []
+    for line in (text or '').splitlines():
+        if _QUOTE_HEADER.match(line):
+            break
+        if not line.lstrip().startswith('>'):
+            lines.append(line)
+    return '\n'.join(lines)
+
+def _features(text: str) -> List[str]:
+    return _TOKEN.findall(_DIGITS.sub('#', text.lower()))
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def simhash(features) -> int:
+    """64-bit SimHash of a set of features (unsigned)"""
+    if not features:
+        return 0
+
+    # Count set bits per position column-wise: format + zip + count run in C
+    columns = zip(*(format(_feature_hash(feature), '064b') for feature in features))
+    half = len(features) / 2
+    fingerprint = 0
+    for column in columns:
+        fingerprint = (fingerprint << 1) | (column.count('1') > half)
+    return fingerprint
+
+def fingerprint(text: str) -> Optional[int]:
+    """SimHash of the distinct normalised words a body adds to its thread, None when too short to cluster"""
+    features = set(_features(strip_quoted(text)))
+    # Very short bodies collide too easily to be clustered
+    if len(features) < MIN_WORDS:
+        return None
+    return simhash(features)
+
+def to_signed(value: int) -> int:
+    """Map an unsigned 64-bit value onto SQLite's signed INTEGER"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+def bands(fingerprint: int) -> Tuple[int, ...]:
+    values = []
+    for width in BAND_WIDTHS:
+        values.append(fingerprint & ((1 << width) - 1))
+        fingerprint >>= width
+    return tuple(values)
+
+def distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+def _subject_replacements(source_subject: str, target_subject: str) -> List[Tuple[str, str]]:
+    """Token pairs that differ between two subjects that align word for word"""
+    source_words = _WORD.findall(source_subject or '')
+    target_words = _WORD.findall(target_subject or '')
+    if len(source_words) != len(target_words):
+        return []
+    return [(s, t) for s, t in zip(source_words, target_words) if s != t]
+
+def _content_words(body: str) -> List[str]:
+    lines = strip_quoted(body).strip().splitlines()
+    if lines and _GREETING.match(lines[0]):
+        lines = lines[1:]
+    return _WORD.findall('\n'.join(lines))
+
+def can_reuse(source: Dict, target: Dict) -> bool:
+    """Whether the summary of `source` can stand in for one of `target`
+
+    Both are dicts with sender, subject and body. Being in the same cluster
+    is not enough: a reply, another sender's mail or a template with other
+    amounts would get a summary with the wrong content, so replies are never
+    reused and the rest must match word for word.
+    """
+    if source['sender'] != target['sender']:
+        return False
+    # A reply's summary depends on the thread it answers, which the body alone does not pin down
+    if _REPLY_PREFIX.match(source['subject'] or '') or _REPLY_PREFIX.match(target['subject'] or ''):
+        return False
+
+    replacements = dict(_subject_replacements(source['subject'], target['subject']))
+    source_words = [replacements.get(word, word) for word in _content_words(source['body'])]
+    return bool(source_words) and source_words == _content_words(target['body'])
+
+def reuse_summary(match: Dict) -> Dict:
+    """Build a summary for an email from a near-duplicate's (see DatabaseManager.get_cluster_summary)
+
+    Templated mail usually differs in a few subject tokens (invoice numbers,
+    names, months); where the two subjects align word for word, those tokens
+    are swapped in the summary text too.
+    """
+    replacements = _subject_replacements(match['source_subject'], match['subject'])
+
+    summary = {}
+    for field in ('topic', 'key_points', 'action_required'):
+        text = match[field] or ''
+        for source, target in replacements:
+            text = re.sub(rf"\b{re.escape(source)}\b", target, text)
+        summary[field] = text
+
+    summary['raw_summary'] = f"Reused from near-duplicate email {match['source_email_id']}"
+    summary['provider'] = match['provider']
+    SUMMARIES_REUSED.inc()
+    return summary
@@ -0,0 +1,207 @@
+"""Per-day inbox digests, maintained as emails and summaries are saved.
+
+Each received date has one ``daily_digests`` row holding its email, summary
+and action counts, counts by sender and by summary topic, and the
+action-required items ranked by urgency, so a day's digest is read with a
+single primary-key lookup. New emails and first summaries are folded into
+the row inside the transaction that writes them (``add_to_digests``). Writes
+that change or remove something a day already counted (re-summarizing,
+re-fetching with different headers, archiving) rebuild that day from its
+emails instead (``rebuild_digest``); those are rare.
+
+The LLM-written overview is not produced here. Adding a summary only marks
+the day's overview pending; see backend.services.digest_service for the
+debounced regeneration.
+"""
+
+import json
+import re
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+# Action items kept per day, most urgent first
+MAX_ACTIONS = 25
+# Senders and topics returned by read_digest; the stored counts are complete
+TOP_ENTRIES = 20
+
+URGENT_TERMS = ('urgent', 'asap', 'immediately', 'critical', 'overdue', 'deadline', 'due',
+                'today', 'tonight', 'tomorrow', 'eod')
+_URGENT = re.compile(r"\b(%s)\b" % '|'.join(URGENT_TERMS))
+_NO_ACTION = re.compile(r"^\W*(no|none|n/?a|nothing|not required)\b")
+
+DIGEST_FIELDS = ('day', 'email_count', 'summary_count', 'action_count', 'senders', 'topics', 'actions',
+                 'updated_at', 'summaries_changed_at', 'overview', 'overview_provider', 'overview_generated_at',
+                 'overview_pending_since')
+_COLUMNS = ', '.join(DIGEST_FIELDS)
+_JSON_FIELDS = ('senders', 'topics', 'actions')
+
+def needs_action(action_required: Optional[str]) -> bool:
+    """Whether a summary's ACTION field asks for something ("No", "None" and blanks do not)"""
+    text = (action_required or '').strip().lower()
+    return bool(text) and not _NO_ACTION.match(text)
+
+def urgency(subject: Optional[str], action_required: Optional[str]) -> int:
+    """Rank of an action item: 1, plus one per distinct urgency term in the subject or action"""
+    text = f"{subject or ''} {action_required or ''}".lower()
+    return 1 + len(set(_URGENT.findall(text)))
+
+def _action_item(email_id: int, sender: str, subject: str, received_at, action_required: str) -> Dict:
+    return {
+        'email_id': email_id,
+        'sender': sender,
+        'subject': subject,
+        'action': action_required,
+        'urgency': urgency(subject, action_required),
+        'received_at': str(received_at) if received_at is not None else None,
+    }
+
+def _rank(actions: List[Dict]) -> List[Dict]:
+    # Most urgent first; among equals, whatever has been waiting longest
+    return sorted(actions, key=lambda item: (-item['urgency'], item['received_at'] or '', item['email_id']))
+
+def _empty(day: str) -> Dict:
+    digest = dict.fromkeys(DIGEST_FIELDS)
+    digest.update(day=day, email_count=0, summary_count=0, action_count=0, senders={}, topics={}, actions=[])
+    return digest
+
+def _load(cursor, day: str) -> Dict:
+    row = cursor.execute(f'SELECT {_COLUMNS} FROM daily_digests WHERE day = ?', (day,)).fetchone()
+    if not row:
+        return _empty(day)
+
+    digest = dict(zip(DIGEST_FIELDS, row))
+    for field in _JSON_FIELDS:
+        digest[field] = json.loads(digest[field])
+    return digest
+
+def _store(cursor, digest: Dict):
+    values = [
+        json.dumps(digest[field], separators=(',', ':')) if field in _JSON_FIELDS else digest[field]
+        for field in DIGEST_FIELDS
+    ]
+    cursor.execute(
+        f"INSERT OR REPLACE INTO daily_digests ({_COLUMNS}) VALUES ({', '.join('?' * len(DIGEST_FIELDS))})",
+        values
+    )
+
+def _add_summary(digest: Dict, item: Dict, now: float):
+    summary = item['summary']
+    digest['summary_count'] += 1
+    topic = summary['topic'] or ''
+    digest['topics'][topic] = digest['topics'].get(topic, 0) + 1
+
+    if needs_action(summary['action_required']):
+        digest['action_count'] += 1
+        digest['actions'] = _rank(digest['actions'] + [_action_item(
+            item['email_id'], item['sender'], item['subject'], item['received_at'], summary['action_required'])
+        ])[:MAX_ACTIONS]
+
+    # The overview no longer covers every summary of the day
+    digest['summaries_changed_at'] = now
+    if digest['overview_pending_since'] is None:
+        digest['overview_pending_since'] = now
+
+def add_to_digests(cursor, items: Iterable[Dict], now: float):
+    """Fold new emails and first summaries into their days' digests; run inside the writing transaction
+
+    Each item has ``day``, ``email_id``, ``sender``, ``subject`` and
+    ``received_at``, ``new_email`` (count the email itself) and ``summary``
+    (a dict with topic and action_required, or None). Items whose email has
+    no received date (``day`` None) are skipped.
+    """
+    digests: Dict[str, Dict] = {}
+    for item in items:
+        day = item['day']
+        if day is None:
+            continue
+        digest = digests.get(day)
+        if digest is None:
+            digest = digests[day] = _load(cursor, day)
+
+        if item['new_email']:
+            digest['email_count'] += 1
+            sender = item['sender'] or ''
+            digest['senders'][sender] = digest['senders'].get(sender, 0) + 1
+        if item['summary'] is not None:
+            _add_summary(digest, item, now)
+        digest['updated_at'] = now
+
+    for digest in digests.values():
+        _store(cursor, digest)
+
+def rebuild_digest(cursor, day: str, now: float, summaries_changed: bool = False):
+    """Recompute a day's counts and action items from its emails, keeping the overview state
+
+    ``summaries_changed`` marks the overview pending, for rebuilds caused by
+    a summary being replaced. A day left without emails loses its row.
+    """
+    previous = _load(cursor, day)
+    start = date.fromisoformat(day)
+
+    # The range (with a day of slack for timezone offsets) keeps the received_at index usable
+    rows = cursor.execute('''
+        SELECT e.id, e.sender, e.subject, e.received_at, s.id, s.topic, s.action_required
+        FROM emails e
+        LEFT JOIN summaries s ON s.email_id = e.id
+        WHERE e.received_at >= ? AND e.received_at < ? AND DATE(e.received_at) = ?
+    ''', ((start - timedelta(days=1)).isoformat(), (start + timedelta(days=2)).isoformat(), day)).fetchall()
+
+    if not rows:
+        cursor.execute('DELETE FROM daily_digests WHERE day = ?', (day,))
+        return
+
+    digest = _empty(day)
+    for field in ('summaries_changed_at', 'overview', 'overview_provider', 'overview_generated_at',
+                  'overview_pending_since'):
+        digest[field] = previous[field]
+
+    actions = []
+    for email_id, sender, subject, received_at, summary_id, topic, action_required in rows:
+        digest['email_count'] += 1
+        digest['senders'][sender or ''] = digest['senders'].get(sender or '', 0) + 1
+        if summary_id is None:
+            continue
+        digest['summary_count'] += 1
+        digest['topics'][topic or ''] = digest['topics'].get(topic or '', 0) + 1
+        if needs_action(action_required):
+            actions.append(_action_item(email_id, sender, subject, received_at, action_required))
+
+    digest['action_count'] = len(actions)
+    digest['actions'] = _rank(actions)[:MAX_ACTIONS]
+    digest['updated_at'] = now
+    if summaries_changed and digest['summary_count']:
+        digest['summaries_changed_at'] = now
+        if digest['overview_pending_since'] is None:
+            digest['overview_pending_since'] = now
+
+    _store(cursor, digest)
+
+def _top(counts: Dict[str, int], key: str) -> List[Dict]:
+    ranked = sorted(counts.items(), key=lambda entry: (-entry[1], entry[0]))[:TOP_ENTRIES]
+    return [{key: name, 'count': count} for name, count in ranked]
+
+def read_digest(cursor, day: str) -> Dict:
+    """A day's digest as served by the API, with an empty one for days without mail"""
+    digest = _load(cursor, day)
+    overview = None
+    if digest['overview'] is not None:
+        overview = {
+            'text': digest['overview'],
+            'provider': digest['overview_provider'],
+            'generated_at': digest['overview_generated_at'],
+        }
+
+    return {
+        'date': day,
+        'email_count': digest['email_count'],
+        'summary_count': digest['summary_count'],
+        'action_count': digest['action_count'],
+        'senders': _top(digest['senders'], 'sender'),
+        'topics': _top(digest['topics'], 'topic'),
+        'actions': digest['actions'],
+        'overview': overview,
+        # Summaries arrived since the overview was written; a regeneration is scheduled
+        'overview_pending': digest['overview_pending_since'] is not None,
+        'summaries_changed_at': digest['summaries_changed_at'],
+        'updated_at': digest['updated_at'],
+    }
@@ -0,0 +1,127 @@
+"""In-process pub/sub for live updates pushed to clients over SSE.
+
+Publishers (API handlers, worker threads) call ``EVENTS.publish`` from any
+thread. Every event gets an id and goes into a bounded ring buffer, so a
+client that reconnects with ``Last-Event-ID`` gets what it missed replayed.
+Each subscriber has its own bounded queue on the event loop; a subscriber
+that falls behind is closed rather than slowing down the others, and picks
+up again from the buffer when it reconnects.
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set
+
+from backend.config import settings
+from backend.metrics import REGISTRY
+
+EVENTS_PUBLISHED = REGISTRY.counter(
+    'inboxprism_events_published_total', 'Live update events published', ('type',))
+EVENT_SUBSCRIBERS_DROPPED = REGISTRY.counter(
+    'inboxprism_event_subscribers_dropped_total', 'SSE subscribers closed for falling behind')
+
+class Event:
+    __slots__ = ('id', 'seq', 'type', 'account', 'data')
+
+    def __init__(self, event_id: str, seq: int, event_type: str, account: Optional[str], data: Dict):
+        self.id = event_id
+        self.seq = seq
+        self.type = event_type
+        self.account = account
+        self.data = data
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop, account: Optional[str], queue_size: int):
+        self.loop = loop
+        self.account = account
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def wants(self, event: Event) -> bool:
+        return self.account is None or event.account is None or event.account == self.account
+
+    def _deliver(self, event: Event):
+        # Runs on the subscriber's event loop
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.closed = True
+            EVENT_SUBSCRIBERS_DROPPED.inc()
+
+def _deliver_all(subscribers: List[Subscription], event: Event):
+    for sub in subscribers:
+        sub._deliver(event)
+
+class EventBus:
+    def __init__(self, buffer_size: int = 1000, queue_size: int = 1000):
+        self.queue_size = queue_size
+        # Ids are "<boot>-<seq>", so ids from before a restart are recognised as stale
+        self.boot = format(int(time.time() * 1000), 'x')
+        self._seq = itertools.count(1)
+        self._buffer: Deque[Event] = deque(maxlen=buffer_size)
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event_type: str, data: Dict, account: Optional[str] = None) -> Event:
+        """Record an event and fan it out; safe to call from any thread"""
+        with self._lock:
+            seq = next(self._seq)
+            event = Event(f"{self.boot}-{seq}", seq, event_type, account, data)
+            self._buffer.append(event)
+            subscribers = [sub for sub in self._subscribers if sub.wants(event)]
+
+        EVENTS_PUBLISHED.inc(type=event_type)
+
+        # One wake-up per event loop (normally just the server's), not per subscriber
+        by_loop: Dict[asyncio.AbstractEventLoop, List[Subscription]] = {}
+        for sub in subscribers:
+            by_loop.setdefault(sub.loop, []).append(sub)
+        for loop, subs in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver_all, subs, event)
+            except RuntimeError:
+                # Loop already closed, e.g. during shutdown
+                pass
+        return event
+
+    def subscribe(self, account: Optional[str] = None, last_event_id: Optional[str] = None):
+        """Register a subscriber on the running loop, return (subscription, replay, gap)
+
+        ``replay`` holds buffered events after ``last_event_id``. ``gap`` is
+        True when that id is no longer in the buffer (too old, or from before
+        a restart), in which case the client should refetch its state.
+        """
+        sub = Subscription(asyncio.get_running_loop(), account, self.queue_size)
+
+        with self._lock:
+            self._subscribers.add(sub)
+            replay, gap = self._since(last_event_id) if last_event_id else ([], False)
+
+        return sub, [event for event in replay if sub.wants(event)], gap
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subscribers.discard(sub)
+        sub.closed = True
+
+    def _since(self, last_event_id: str):
+        boot, _, seq = last_event_id.partition('-')
+        if boot != self.boot or not seq.isdigit():
+            return list(self._buffer), True
+
+        seq = int(seq)
+        events: List[Event] = [event for event in self._buffer if event.seq > seq]
+        # Missed events fell off the buffer if the oldest one left is not the next after seq
+        gap = bool(self._buffer) and self._buffer[0].seq > seq + 1
+        return events, gap
+
+EVENTS = EventBus(settings.events_buffer_size, settings.events_queue_size)
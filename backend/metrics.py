@@ -0,0 +1,250 @@
+"""In-process metrics for InboxPrism, exposed in Prometheus text format.
+
+Counters and latency histograms are plain Python objects guarded by one lock
+per metric; an observation is a dict lookup, a bisect and two additions, so
+instrumentation is cheap enough to leave on in production. The API serves
+the registry at ``GET /metrics`` and ``run_processor.py`` logs a summary at
+the end of each run.
+"""
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _label_key(label_names: Sequence[str], labels: Dict[str, str]) -> Tuple[str, ...]:
+    return tuple(str(labels.get(name, '')) for name in label_names)
+
+def _format_labels(label_names: Sequence[str], key: Tuple[str, ...], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, key)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_float(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(self.label_names, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(self.label_names, labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.label_names, key)} {_format_float(value)}' for key, value in items]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {key: value for key, value in self._values.items()}
+
+    def merge(self, snapshot: Dict):
+        with self._lock:
+            for key, value in snapshot.items():
+                self._values[key] = self._values.get(key, 0.0) + value
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+class Histogram:
+    """Latency histogram with cumulative buckets, sum and count per label set"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.label_names, labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a block; an 'outcome' label is set to error on exceptions"""
+        start = time.perf_counter()
+        try:
+            yield labels
+        except BaseException:
+            if 'outcome' in self.label_names and labels.get('outcome', 'ok') == 'ok':
+                labels['outcome'] = 'error'
+            raise
+        finally:
+            if 'outcome' in self.label_names:
+                labels.setdefault('outcome', 'ok')
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(_label_key(self.label_names, labels))
+        return int(sum(state[:-1])) if state else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state[:-1]):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, f'le="{_format_float(bound)}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.label_names, key)
+            lines.append(f'{self.name}_sum{labels} {_format_float(state[-1])}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+    def summary(self) -> List[str]:
+        """Human-readable count, mean and approximate p50/p95 per label set"""
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+
+        lines = []
+        for key, state in items:
+            total = int(sum(state[:-1]))
+            if not total:
+                continue
+            labels = ' '.join(f'{name}={value}' for name, value in zip(self.label_names, key))
+            lines.append(
+                f'{self.name} {labels}: n={total} total={state[-1]:.3f}s mean={state[-1] / total * 1000:.1f}ms '
+                f'p50<={self._quantile_bound(state, 0.5)} p95<={self._quantile_bound(state, 0.95)}'
+            )
+        return lines
+
+    def _quantile_bound(self, state: List[float], quantile: float) -> str:
+        total = sum(state[:-1])
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), state[:-1]):
+            cumulative += count
+            if cumulative >= quantile * total:
+                return f'{bound * 1000:g}ms' if bound != float('inf') else '+Inf'
+        return '+Inf'
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {key: list(state) for key, state in self._values.items()}
+
+    def merge(self, snapshot: Dict):
+        with self._lock:
+            for key, other in snapshot.items():
+                state = self._values.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+                for i, value in enumerate(other):
+                    state[i] += value
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type_name}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> List[str]:
+        lines = []
+        for metric in self._metrics.values():
+            if isinstance(metric, Histogram):
+                lines.extend(metric.summary())
+            else:
+                for key, value in sorted(metric.snapshot().items()):
+                    labels = ' '.join(f'{name}={v}' for name, v in zip(metric.label_names, key))
+                    lines.append(f'{metric.name} {labels}: {value:g}')
+        return lines
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Picklable state, used to collect metrics from worker processes"""
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def drain(self) -> Dict[str, Dict]:
+        """Snapshot then reset, so a long-lived worker reports only new observations"""
+        snapshot = self.snapshot()
+        for metric in self._metrics.values():
+            metric.reset()
+        return snapshot
+
+    def merge(self, snapshot: Dict[str, Dict]):
+        for name, values in snapshot.items():
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric.merge(values)
+
+REGISTRY = Registry()
+
+GMAIL_REQUEST_SECONDS = REGISTRY.histogram(
+    'inboxprism_gmail_request_seconds', 'Gmail API call latency', ('method', 'outcome'))
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    'inboxprism_llm_request_seconds', 'LLM call latency per attempt', ('provider', 'outcome'))
+LLM_BACKOFF_SECONDS = REGISTRY.counter(
+    'inboxprism_llm_backoff_seconds_total', 'Time spent sleeping between LLM retries', ('provider',))
+DB_OPERATION_SECONDS = REGISTRY.histogram(
+    'inboxprism_db_operation_seconds', 'DatabaseManager method latency', ('operation', 'outcome'))
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'inboxprism_http_request_seconds', 'HTTP request latency by route', ('method', 'route', 'status'))
+
+def timed_operation(histogram: Histogram, operation: Optional[str] = None):
+    """Decorator recording a function's latency under an 'operation' label"""
+    def decorator(func):
+        name = operation or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(operation=name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,79 @@
+"""Opt-in wall-clock sampling profiler.
+
+A background thread samples the stacks of all other threads at a fixed
+interval and counts them in the folded format (``frame;frame;frame count``)
+understood by flamegraph.pl, speedscope and similar tools. Idle frames
+(event loop select, thread pool workers waiting for work) are dropped so the
+profile shows where requests actually spent their time.
+"""
+
+import os
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+IDLE_FRAMES = {
+    ('selectors.py', 'select'),
+    ('threading.py', 'wait'),
+    ('queue.py', 'get'),
+    ('thread.py', '_worker'),
+    ('base_events.py', '_run_once'),
+    ('profiling.py', '_run'),
+}
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        """Profile in folded-stack format, one 'stack count' line per unique stack"""
+        return '\n'.join(f"{stack} {count}" for stack, count in self.samples.most_common()) + '\n'
+
+    def save(self, directory: str, label: str = 'profile') -> str:
+        """Write the folded profile to a timestamped file, return its path"""
+        os.makedirs(directory, exist_ok=True)
+        safe_label = ''.join(c if c.isalnum() or c in '-_' else '_' for c in label).strip('_') or 'profile'
+        path = os.path.join(directory, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{safe_label}.folded")
+        with open(path, 'w') as f:
+            f.write(self.folded())
+        return path
@@ -0,0 +1,85 @@
+import os
+import re
+import threading
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    from backend.services.gmail_service import GmailService
+
+DEFAULT_ACCOUNT = 'default'
+
+_ACCOUNT_ID = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.@-]{0,63}$')
+
+class AccountService:
+    """Resolves per-account credentials and database shard locations.
+
+    The "default" account keeps the single-mailbox paths (token.json,
+    GMAIL_TOKEN_JSON, emails.db); every other account gets its own token
+    file or environment variable and its own shard file.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self._gmail: Dict[str, 'GmailService'] = {}
+        self._lock = threading.Lock()
+        # Parsed once so a bad GMAIL_ACCOUNTS stops startup instead of failing every request
+        self._accounts = self._parse_accounts(settings.gmail_accounts)
+
+    def _parse_accounts(self, configured: str) -> List[str]:
+        accounts = [DEFAULT_ACCOUNT]
+        env_names = {self.token_env(DEFAULT_ACCOUNT): DEFAULT_ACCOUNT}
+        for account in configured.split(','):
+            account = account.strip()
+            if not account or account in accounts:
+                continue
+            # Ids that differ only in punctuation or case would read each other's token variable
+            env_name = self.token_env(account)
+            if env_name in env_names:
+                raise ValueError(
+                    f"Account ids {env_names[env_name]!r} and {account!r} both map to {env_name}")
+            env_names[env_name] = account
+            accounts.append(account)
+        return accounts
+
+    def list_accounts(self) -> List[str]:
+        """Return configured account ids, default first"""
+        return list(self._accounts)
+
+    def is_known(self, account: str) -> bool:
+        return account in self._accounts
+
+    def validate(self, account: str) -> str:
+        """Reject account ids that are unsafe to use in file names"""
+        if not _ACCOUNT_ID.match(account or ''):
+            raise ValueError(f"Invalid account id: {account!r}")
+        return account
+
+    def database_path(self, account: str) -> str:
+        if account == DEFAULT_ACCOUNT:
+            return self.settings.database_path
+        os.makedirs(self.settings.shards_dir, exist_ok=True)
+        return os.path.join(self.settings.shards_dir, f"{self.validate(account)}.db")
+
+    def token_path(self, account: str) -> str:
+        if account == DEFAULT_ACCOUNT:
+            return self.settings.gmail_token_path
+        return os.path.join(self.settings.gmail_tokens_dir, f"{self.validate(account)}.json")
+
+    def token_env(self, account: str) -> str:
+        if account == DEFAULT_ACCOUNT:
+            return 'GMAIL_TOKEN_JSON'
+        return 'GMAIL_TOKEN_JSON_' + re.sub(r'[^A-Za-z0-9]', '_', self.validate(account)).upper()
+
+    def gmail_service(self, account: str) -> 'GmailService':
+        """Return the Gmail client for an account, created on first use"""
+        # Google API client libraries are slow to import; load them on demand
+        from backend.services.gmail_service import GmailService
+
+        with self._lock:
+            if account not in self._gmail:
+                self._gmail[account] = GmailService(
+                    self.settings.gmail_credentials_path,
+                    self.token_path(account),
+                    self.token_env(account),
+                )
+            return self._gmail[account]
@@ -1,24 +1,39 @@
 import logging
-from langchain_openai import AzureChatOpenAI
-import google.generativeai as genai
 from backend.config import settings
+from backend.metrics import LLM_BACKOFF_SECONDS, LLM_REQUEST_SECONDS
+from backend.tracing import span
 from typing import Dict
 import time
 import re
 
 logger = logging.getLogger(__name__)
 
+class SummarizationError(Exception):
+    """The provider could not produce a summary after all retries"""
+
+    def __init__(self, message: str, rate_limited: bool = False):
+        super().__init__(message)
+        self.rate_limited = rate_limited
+
 class AIService:
     def __init__(self):
         self.provider = settings.default_provider
         self._init_client()
 
     def _init_client(self):
-        """Initialize AI client based on provider"""
+        """Initialize AI client based on provider
+
+        Provider SDKs are imported here, not at module load: each one takes
+        hundreds of milliseconds to import and only one is ever used.
+        """
         if self.provider == 'gemini':
+            import google.generativeai as genai
+
             genai.configure(api_key=settings.google_api_key)
             self.client = genai.GenerativeModel('gemini-1.5-flash-latest')
         elif self.provider == 'azure':
+            from langchain_openai import AzureChatOpenAI
+
             self.client = AzureChatOpenAI(
                 openai_api_key=settings.azure_openai_api_key,
                 azure_endpoint=settings.azure_openai_endpoint,
@@ -26,9 +41,16 @@ class AIService:
                 openai_api_version=settings.azure_openai_api_version,
                 openai_api_type=settings.openai_api_type,
             )
+        elif self.provider == 'synthetic':
+            # Offline stand-in for load tests: canned output after a fixed delay
+            self.client = None
 
     def summarize_email(self, email_body: str, max_retries: int = 3) -> Dict[str, str]:
-        """Summarize email with retry logic and structured output"""
+        """Summarize email with retry logic and structured output
+
+        Raises SummarizationError once the retries are used up; callers keep
+        the email queued instead of storing a placeholder summary.
+        """
 
         prompt = f"""
         Analyze the following email and provide a structured summary:
@@ -50,44 +72,90 @@ class AIService:
         {email_body[:4000]}
         """
 
-        for attempt in range(max_retries):
-            try:
-                if self.provider == 'gemini':
-                    response = self.client.generate_content(prompt)
-                    raw_summary = response.text
-                elif self.provider == 'azure':
-                    response = self.client.invoke([("user", prompt)])
-                    raw_summary = getattr(response, 'content', str(response))
+        raw_summary = self._complete(prompt, max_retries)
+
+        # Parse structured response
+        parsed = self._parse_summary(raw_summary)
+        parsed['raw_summary'] = raw_summary
+        parsed['provider'] = self.provider
+
+        return parsed
+
+    def write_digest_overview(self, digest: Dict, max_retries: int = 3) -> str:
+        """Write a short overview of a day's inbox from its digest (see DatabaseManager.get_digest)
 
-                # Parse structured response
-                parsed = self._parse_summary(raw_summary)
-                parsed['raw_summary'] = raw_summary
-                parsed['provider'] = self.provider
+        Raises SummarizationError once the retries are used up.
+        """
+        senders = ', '.join(f"{entry['sender']} ({entry['count']})" for entry in digest['senders'][:10])
+        topics = '\n'.join(f"• {entry['topic']} ({entry['count']})" for entry in digest['topics'][:15])
+        actions = '\n'.join(f"• [{item['urgency']}] {item['subject']}: {item['action']}"
+                            for item in digest['actions'][:15])
 
-                return parsed
+        prompt = f"""
+        Write a brief overview of one day's inbox for its owner.
+
+        **Instructions:**
+        1. Use 3-5 sentences of plain prose, no lists or headings
+        2. Lead with what needs attention, most urgent first
+        3. Mention the main themes of the day and who wrote most
+
+        **Digest for {digest['date']}:**
+        {digest['email_count']} emails, {digest['summary_count']} summarized, {digest['action_count']} need action
+        Top senders: {senders or 'none'}
+        Topics:
+        {topics or 'none'}
+        Action items (urgency in brackets):
+        {actions or 'none'}
+        """
+
+        return self._complete(prompt, max_retries).strip()
+
+    def _complete(self, prompt: str, max_retries: int = 3) -> str:
+        """Call the provider with retries and backoff on rate limits, return the raw text"""
+        last_error = None
+        for attempt in range(max_retries):
+            try:
+                with span('llm.call', provider=self.provider, attempt=attempt + 1), \
+                        LLM_REQUEST_SECONDS.time(provider=self.provider) as labels:
+                    try:
+                        return self._call_provider(prompt)
+                    except Exception as e:
+                        labels['outcome'] = 'rate_limited' if self._is_rate_limited(e) else 'error'
+                        raise
 
             except Exception as e:
                 logger.warning(f"Attempt {attempt + 1} failed: {e}")
-                if "rate limit" in str(e).lower() or "quota" in str(e).lower():
+                last_error = e
+                if self._is_rate_limited(e) and attempt < max_retries - 1:
                     wait_time = 2 ** attempt  # Exponential backoff
                     logger.info(f"Rate limited, waiting {wait_time} seconds...")
-                    time.sleep(wait_time)
-                elif attempt == max_retries - 1:
-                    return {
-                        'topic': 'Error summarizing email',
-                        'key_points': f'Failed to summarize: {str(e)}',
-                        'action_required': 'No',
-                        'raw_summary': f'Error: {str(e)}',
-                        'provider': self.provider
-                    }
-
-        return {
-            'topic': 'Summary failed',
-            'key_points': 'Unable to generate summary after retries',
-            'action_required': 'No',
-            'raw_summary': 'Max retries exceeded',
-            'provider': self.provider
-        }
+                    LLM_BACKOFF_SECONDS.inc(wait_time, provider=self.provider)
+                    with span('llm.backoff', seconds=wait_time):
+                        time.sleep(wait_time)
+
+        raise SummarizationError(
+            f"{self.provider} failed after {max_retries} attempts: {last_error}",
+            rate_limited=self._is_rate_limited(last_error)
+        )
+
+    def _call_provider(self, prompt: str) -> str:
+        """Send one prompt to the configured provider, return the raw text"""
+        if self.provider == 'gemini':
+            response = self.client.generate_content(prompt)
+            return response.text
+        elif self.provider == 'azure':
+            response = self.client.invoke([("user", prompt)])
+            return getattr(response, 'content', str(response))
+        elif self.provider == 'synthetic':
+            time.sleep(settings.synthetic_llm_latency_ms / 1000)
+            if '**Email Content:**' not in prompt:
+                return "Synthetic overview: " + ' '.join(prompt.rsplit(':**', 1)[-1].split()[:30])
+            content = prompt.split('**Email Content:**', 1)[-1].split()
+            return (f"TOPIC: {' '.join(content[:6])}\nKEY_POINTS:\n• {' '.join(content[6:16])}\n"
+                    f"• {' '.join(content[16:26])}\nACTION: No")
+
+    def _is_rate_limited(self, error: Exception) -> bool:
+        return "rate limit" in str(error).lower() or "quota" in str(error).lower()
 
     def _parse_summary(self, raw_summary: str) -> Dict[str, str]:
         """Parse AI response into structured format"""
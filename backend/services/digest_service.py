@@ -0,0 +1,64 @@
+import logging
+import threading
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from backend.database.manager import DatabaseManager
+from backend.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DIGEST_OVERVIEWS = REGISTRY.counter(
+    'inboxprism_digest_overviews_total', 'Daily digest overviews written by the LLM', ('outcome',))
+
+class DigestRefresher:
+    """Regenerates the LLM-written overviews of daily digests, debounced
+
+    Saving a summary only marks its day's overview pending. A pending
+    overview is regenerated once no summary has arrived for
+    ``quiet_seconds``, or ``max_wait_seconds`` after it became pending, so a
+    burst of incoming mail costs one LLM call per day instead of one per
+    email. Only the last ``overview_days`` days are refreshed automatically.
+    """
+
+    def __init__(self, db: DatabaseManager, ai_service_factory: Callable, quiet_seconds: int = 120,
+                 max_wait_seconds: int = 900, overview_days: int = 7):
+        self.db = db
+        self.ai_service_factory = ai_service_factory
+        self.quiet_seconds = quiet_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.overview_days = overview_days
+
+    def due_days(self) -> List[str]:
+        since = (date.today() - timedelta(days=max(self.overview_days - 1, 0))).isoformat()
+        return self.db.get_due_digests(self.quiet_seconds, self.max_wait_seconds, since)
+
+    def run(self, days: Optional[Iterable[str]] = None, stop: Optional[threading.Event] = None) -> Dict[str, int]:
+        """Regenerate due overviews (or those of `days`), return counts of generated/skipped/failed"""
+        result = {'generated': 0, 'skipped': 0, 'failed': 0}
+
+        for day in (days if days is not None else self.due_days()):
+            if stop is not None and stop.is_set():
+                break
+            result[self.refresh(day)] += 1
+
+        return result
+
+    def refresh(self, day: str) -> str:
+        """Write one day's overview from its current digest"""
+        digest = self.db.get_digest(day)
+        if not digest['summary_count']:
+            return 'skipped'
+
+        ai_service = self.ai_service_factory()
+        try:
+            overview = ai_service.write_digest_overview(digest)
+        except Exception as e:
+            # Stays pending, so the next run tries again
+            logger.warning(f"Digest overview for {day} failed: {e}")
+            DIGEST_OVERVIEWS.inc(outcome='error')
+            return 'failed'
+
+        self.db.save_digest_overview(day, overview, ai_service.provider, digest['summaries_changed_at'])
+        DIGEST_OVERVIEWS.inc(outcome='ok')
+        return 'generated'
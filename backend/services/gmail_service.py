@@ -1,31 +1,36 @@
 import base64
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
-from typing import List, Dict
+from typing import List, Dict, Optional
 import os
 import logging
 
+from backend.metrics import GMAIL_REQUEST_SECONDS
+from backend.tracing import span
+
 logger = logging.getLogger(__name__)
 
 class GmailService:
-    def __init__(self, credentials_file: str = 'credentials.json', token_file: str = 'token.json'):
+    def __init__(self, credentials_file: str = 'credentials.json', token_file: str = 'token.json', token_env: str = 'GMAIL_TOKEN_JSON'):
         self.credentials_file = credentials_file
         self.token_file = token_file
+        self.token_env = token_env
         self.scopes = ['https://www.googleapis.com/auth/gmail.readonly']
         self.service = None
+        self.creds = None
 
     def authenticate(self):
         """Handle Gmail OAuth authentication with support for environment variables"""
         creds = None
         
         # Try to get credentials from environment variables first (for production)
-        if os.getenv('GMAIL_TOKEN_JSON'):
+        if os.getenv(self.token_env):
             try:
-                token_data = json.loads(os.getenv('GMAIL_TOKEN_JSON'))
+                token_data = json.loads(os.getenv(self.token_env))
                 creds = Credentials.from_authorized_user_info(token_data, self.scopes)
                 logger.info("Using Gmail credentials from environment variables")
             except Exception as e:
@@ -63,19 +68,49 @@ class GmailService:
                 flow = InstalledAppFlow.from_client_secrets_file(self.credentials_file, self.scopes)
                 creds = flow.run_local_server(port=0)
                 
-                # Save token to file
+                # Save token to file; per-account tokens live in a directory that may not exist yet
+                token_dir = os.path.dirname(self.token_file)
+                if token_dir:
+                    os.makedirs(token_dir, exist_ok=True)
                 with open(self.token_file, 'w') as token:
                     token.write(creds.to_json())
             else:
-                raise Exception("No Gmail credentials found. Please configure GMAIL_TOKEN_JSON environment variable.")
+                raise Exception(f"No Gmail credentials found. Please configure {self.token_env} environment variable.")
 
+        self.creds = creds
         self.service = build('gmail', 'v1', credentials=creds)
         return self.service
 
-    def fetch_emails(self, hours: int = 24, query_filter: str = "is:unread in:inbox") -> List[Dict]:
-        """Fetch emails from Gmail"""
+    def refresh_if_expiring(self, margin_seconds: int = 300) -> bool:
+        """Refresh the access token ahead of expiry, return True if a refresh happened
+
+        Long-running processes call this before each cycle so requests never
+        start with a token that is about to lapse.
+        """
+        if not self.service:
+            with span('gmail.authenticate'), GMAIL_REQUEST_SECONDS.time(method='authenticate'):
+                self.authenticate()
+            return True
+
+        creds = self.creds
+        if not creds or not creds.refresh_token or not creds.expiry:
+            return False
+
+        # google-auth keeps expiry as a naive UTC datetime
+        remaining = creds.expiry - datetime.now(timezone.utc).replace(tzinfo=None)
+        if remaining > timedelta(seconds=margin_seconds):
+            return False
+
+        with span('gmail.refresh'), GMAIL_REQUEST_SECONDS.time(method='refresh'):
+            creds.refresh(Request())
+        logger.info("Refreshed Gmail access token ahead of expiry")
+        return True
+
+    def fetch_emails(self, hours: int = 24, query_filter: str = "is:unread in:inbox", max_results: Optional[int] = None) -> List[Dict]:
+        """Fetch emails from Gmail, newest first, at most max_results when given"""
         if not self.service:
-            self.authenticate()
+            with span('gmail.authenticate'), GMAIL_REQUEST_SECONDS.time(method='authenticate'):
+                self.authenticate()
 
         time_delta = datetime.now() - timedelta(hours=hours)
         after_timestamp = int(time_delta.timestamp())
@@ -84,7 +119,11 @@ class GmailService:
         logger.info(f"Searching emails with query: {query}")
 
         try:
-            results = self.service.users().messages().list(userId='me', q=query).execute()
+            params = {'userId': 'me', 'q': query}
+            if max_results:
+                params['maxResults'] = max_results
+            with span('gmail.list'), GMAIL_REQUEST_SECONDS.time(method='list'):
+                results = self.service.users().messages().list(**params).execute()
             messages = results.get('messages', [])
 
             emails = []
@@ -103,7 +142,8 @@ class GmailService:
     def _parse_message(self, message_id: str) -> Dict:
         """Parse Gmail message and extract relevant information"""
         try:
-            msg = self.service.users().messages().get(userId='me', id=message_id, format='full').execute()
+            with span('gmail.get'), GMAIL_REQUEST_SECONDS.time(method='get'):
+                msg = self.service.users().messages().get(userId='me', id=message_id, format='full').execute()
 
             headers = msg['payload']['headers']
             subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
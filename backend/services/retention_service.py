@@ -0,0 +1,42 @@
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict
+
+from backend.database.manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+class RetentionService:
+    """Applies the retention policy: purge old bodies, archive old emails, compact"""
+
+    def __init__(self, db: DatabaseManager, body_days: int = 0, archive_days: int = 0, archive_dir: str = 'archive'):
+        self.db = db
+        self.body_days = body_days
+        self.archive_days = archive_days
+        self.archive_dir = archive_dir
+
+    def run(self) -> Dict:
+        """Run one retention pass and return what it did"""
+        now = datetime.now()
+        size_before = self._database_size()
+        result = {'bodies_purged': 0, 'archived': {}, 'pages_released': 0}
+
+        if self.archive_days > 0:
+            cutoff = now - timedelta(days=self.archive_days)
+            logger.info(f"Archiving emails received before {cutoff:%Y-%m-%d} to {self.archive_dir}")
+            result['archived'] = self.db.archive_emails(cutoff, self.archive_dir)
+
+        if self.body_days > 0:
+            cutoff = now - timedelta(days=self.body_days)
+            logger.info(f"Purging bodies of emails received before {cutoff:%Y-%m-%d}")
+            result['bodies_purged'] = self.db.purge_bodies(cutoff)
+
+        result['pages_released'] = self.db.incremental_vacuum()
+        result['size_before'] = size_before
+        result['size_after'] = self._database_size()
+
+        return result
+
+    def _database_size(self) -> int:
+        return os.path.getsize(self.db.db_path) if os.path.exists(self.db.db_path) else 0
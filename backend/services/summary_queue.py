@@ -0,0 +1,96 @@
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+from backend.database.manager import DatabaseManager
+from backend.dedup import reuse_summary
+
+logger = logging.getLogger(__name__)
+
+def make_worker_id() -> str:
+    """Unique lease owner for this process: host, pid and a random suffix"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+class SummaryWorker:
+    """Drains a shard's summary_jobs table
+
+    Jobs are leased in small batches, so several workers (threads or
+    processes) can share one database. A worker that dies leaves its jobs
+    in_progress until the lease expires, then another worker picks them up.
+    Failed attempts are retried with exponential backoff until max_attempts.
+    """
+
+    def __init__(self, db: DatabaseManager, ai_service_factory: Callable, worker_id: Optional[str] = None,
+                 batch_size: int = 10, lease_seconds: int = 300, max_attempts: int = 5,
+                 retry_base_seconds: int = 60, retry_max_seconds: int = 3600):
+        self.db = db
+        self.ai_service_factory = ai_service_factory
+        self.worker_id = worker_id or make_worker_id()
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+
+    def retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with +/-20% jitter so retries from many workers spread out"""
+        delay = min(self.retry_base_seconds * 2 ** (attempts - 1), self.retry_max_seconds)
+        return delay * random.uniform(0.8, 1.2)
+
+    def run(self, stop: Optional[threading.Event] = None, max_jobs: Optional[int] = None) -> Dict[str, int]:
+        """Process due jobs until none are left, return counts of done/failed/lost jobs"""
+        result = {'done': 0, 'failed': 0, 'lost': 0}
+
+        while not (stop is not None and stop.is_set()):
+            limit = self.batch_size
+            if max_jobs is not None:
+                limit = min(limit, max_jobs - sum(result.values()))
+                if limit <= 0:
+                    break
+
+            jobs = self.db.claim_summary_jobs(self.worker_id, limit=limit, lease_seconds=self.lease_seconds,
+                                              max_attempts=self.max_attempts)
+            if not jobs:
+                break
+
+            for job in jobs:
+                if stop is not None and stop.is_set():
+                    # Unprocessed jobs go back to the queue when their lease expires
+                    break
+                result[self.process(job)] += 1
+
+        return result
+
+    def process(self, job: Dict) -> str:
+        """Summarize one leased job and record the outcome"""
+        email_id = job['email_id']
+
+        if not job['body'].strip():
+            return 'done' if self.db.complete_summary_job(email_id, self.worker_id) else 'lost'
+
+        # A near-duplicate that is already summarized saves an LLM call
+        match = self.db.get_cluster_summary(email_id)
+        if match is not None:
+            summary = reuse_summary(match)
+            return 'done' if self.db.complete_summary_job(email_id, self.worker_id, summary) else 'lost'
+
+        try:
+            summary = self.ai_service_factory().summarize_email(job['body'])
+        except Exception as e:
+            delay = self.retry_delay(job['attempts'])
+            if job['attempts'] >= self.max_attempts:
+                logger.error(f"Summary job {email_id} failed for good after {job['attempts']} attempts: {e}")
+            else:
+                logger.warning(f"Summary job {email_id} failed (attempt {job['attempts']}/{self.max_attempts}), "
+                               f"retrying in {delay:.0f}s: {e}")
+            return 'failed' if self.db.fail_summary_job(email_id, self.worker_id, str(e), time.time() + delay) else 'lost'
+
+        if not self.db.complete_summary_job(email_id, self.worker_id, summary):
+            logger.warning(f"Summary job {email_id} lease expired before completion, result discarded")
+            return 'lost'
+        return 'done'
@@ -0,0 +1,163 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+SENDERS = [
+    ('Sarah Chen', 'company.com'), ('Marcus Webb', 'company.com'), ('Priya Natarajan', 'company.com'),
+    ('Tom Okafor', 'company.com'), ('Elena Rossi', 'client-corp.com'), ('David Kim', 'client-corp.com'),
+    ('Billing', 'stripe.com'), ('GitHub', 'github.com'), ('Calendar', 'google.com'),
+    ('Newsletter', 'techweekly.io'), ('Support', 'vendor.io'), ('HR Team', 'company.com'),
+    ('Aisha Mensah', 'partner.org'), ('Jonas Berg', 'partner.org'), ('Security', 'company.com'),
+]
+
+# (subject, topic, key points, action, body sentences)
+TEMPLATES = [
+    ("Weekly sync notes - {project}", "Weekly sync for {project}",
+     "• {project} on track for the next milestone\n• Budget review pending\n• New owner for QA",
+     "Review the notes before Thursday",
+     ["Here are the notes from this week's {project} sync.", "We are on track for the next milestone.",
+      "The budget review for next quarter is still pending and needs input from finance.",
+      "QA will move to a new owner starting Monday.", "Please add anything I missed to the shared doc."]),
+    ("Invoice #{number} for {month}", "Invoice for {month}",
+     "• Invoice #{number} issued\n• Payment due in 30 days", "Pay invoice #{number}",
+     ["Your invoice #{number} for {month} is attached.", "The amount is due within 30 days.",
+      "You can review line items in the billing dashboard.", "Reply to this email if anything looks wrong."]),
+    ("[{project}] Pull request #{number} needs review", "Code review request on {project}",
+     "• PR #{number} opened\n• Two approvals required", "Review PR #{number}",
+     ["A pull request was opened on {project} and you were requested as a reviewer.",
+      "The change touches the ingestion pipeline and adds retries.", "CI is green on the latest commit.",
+      "Two approvals are required before merging."]),
+    ("Urgent: {project} deadline", "Deadline change for {project}",
+     "• Scope changed\n• Deadline may move by two weeks\n• Call requested", "Schedule a call tomorrow",
+     ["We need to talk about the {project} deadline.", "Requirements changed after last week's review.",
+      "Our estimate is that this adds about two weeks of work.", "Can we schedule a call tomorrow morning?",
+      "This affects the launch plan so the sooner the better."]),
+    ("Invitation: {project} planning @ {month}", "Planning meeting for {project}",
+     "• Planning session scheduled\n• Agenda attached", "Accept or decline the invitation",
+     ["You have been invited to the {project} planning session.", "The agenda is attached to the invite.",
+      "Please come with a short list of priorities for your team."]),
+    ("This week in tech #{number}", "Weekly tech newsletter",
+     "• Industry news roundup\n• New tooling releases", "No",
+     ["Welcome to issue #{number} of the newsletter.", "This week: database engines, edge runtimes and AI tooling.",
+      "Our featured article looks at scaling SQLite for read-heavy workloads.",
+      "As always, reply with topics you want covered.", "Unsubscribe at any time from your preferences page."]),
+    ("Security alert: new sign-in", "New sign-in detected",
+     "• Sign-in from a new device\n• No action needed if it was you", "Verify the sign-in",
+     ["We noticed a new sign-in to your account.", "If this was you, no action is needed.",
+      "Otherwise reset your password and review active sessions."]),
+    ("Benefits enrollment closes {month}", "Benefits enrollment deadline",
+     "• Enrollment window closing\n• Changes take effect next month", "Complete enrollment",
+     ["Open enrollment for benefits closes at the end of {month}.",
+      "Changes you make now take effect from the first of next month.",
+      "Reach out to HR with any questions about plans."]),
+]
+
+# Templates sent by machines: no free-form filler, so they form near-duplicate clusters
+NOTIFICATIONS = {
+    "Invoice #{number} for {month}",
+    "[{project}] Pull request #{number} needs review",
+    "Invitation: {project} planning @ {month}",
+    "Security alert: new sign-in",
+    "Benefits enrollment closes {month}",
+}
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn']
+
+PROJECTS = ['Alpha', 'Atlas', 'Beacon', 'Orion', 'Helix', 'Nimbus', 'Quartz', 'Zephyr']
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August',
+          'September', 'October', 'November', 'December']
+FILLER = [
+    "Let me know if you have any questions.", "Thanks for your patience on this.",
+    "I have attached the relevant documents for reference.", "Looping in the rest of the team for visibility.",
+    "We can go over the details in our next one-on-one.", "Happy to jump on a call if that is easier.",
+    "The full report is available on the shared drive.", "Apologies for the late reply on this thread.",
+]
+
+class SyntheticMailbox:
+    """Deterministic generator of realistic-looking emails for load tests
+
+    Emails come from a fixed pool of senders and templates, are spread over
+    the last ``days`` days and reply to earlier threads at ``thread_rate``.
+    Human-written ones have log-normally distributed body sizes (a few
+    hundred bytes up to tens of kilobytes); automated notifications repeat
+    the same text with different names and numbers. A ``summary_rate``
+    fraction carries a ready-made summary.
+    """
+
+    def __init__(self, seed: int = 0, days: int = 90, thread_rate: float = 0.3, summary_rate: float = 0.8):
+        self.random = random.Random(seed)
+        self.days = days
+        self.thread_rate = thread_rate
+        self.summary_rate = summary_rate
+        self.now = datetime.now()
+        self._threads: List[Dict] = []
+
+    def emails(self, count: int) -> Iterator[Dict]:
+        for _ in range(count):
+            yield self.email()
+
+    def email(self) -> Dict:
+        rng = self.random
+        received_at = self.now - timedelta(seconds=rng.uniform(0, self.days * 86400))
+
+        if self._threads and rng.random() < self.thread_rate:
+            thread = rng.choice(self._threads)
+            subject = thread['subject'] if thread['subject'].startswith('Re: ') else f"Re: {thread['subject']}"
+            sender = rng.choice(SENDERS)
+            body = self._body(thread['sentences']) + "\n\n> " + thread['sentences'][0]
+            summary = thread['summary']
+        else:
+            subject_template, topic, key_points, action, sentences = rng.choice(TEMPLATES)
+            values = {'project': rng.choice(PROJECTS), 'month': rng.choice(MONTHS), 'number': rng.randint(100, 99999)}
+            subject = subject_template.format(**values)
+            sentences = [sentence.format(**values) for sentence in sentences]
+            sender = rng.choice(SENDERS)
+            if subject_template in NOTIFICATIONS:
+                # Automated mail: same text every time apart from the name and values
+                body = f"Hi {rng.choice(FIRST_NAMES)},\n\n" + ' '.join(sentences) + "\n\nThis is an automated message."
+            else:
+                body = self._body(sentences)
+            summary = {
+                'topic': topic.format(**values),
+                'key_points': key_points.format(**values),
+                'action_required': action.format(**values),
+            }
+            self._threads.append({'subject': subject, 'sentences': sentences, 'summary': summary})
+            if len(self._threads) > 1000:
+                self._threads.pop(rng.randrange(len(self._threads)))
+
+        name, domain = sender
+        return {
+            # Random even with a fixed seed, so repeated loads never collide
+            'message_id': f"<{uuid.uuid4()}@{domain}>",
+            'sender': f"{name} <{name.lower().replace(' ', '.')}@{domain}>",
+            'subject': subject,
+            'body': body,
+            'received_at': received_at,
+            'summary': self._summary(summary) if rng.random() < self.summary_rate else None,
+        }
+
+    def _body(self, sentences: List[str]) -> str:
+        # Median around 100 words, long tail up to ~5000
+        words = min(5000, max(20, int(self.random.lognormvariate(4.6, 1.0))))
+        parts = list(sentences)
+        length = sum(len(s.split()) for s in parts)
+        while length < words:
+            sentence = self.random.choice(FILLER)
+            parts.append(sentence)
+            length += len(sentence.split())
+        paragraphs = [' '.join(parts[i:i + 4]) for i in range(0, len(parts), 4)]
+        return "Hi,\n\n" + "\n\n".join(paragraphs) + "\n\nBest regards"
+
+    def _summary(self, summary: Dict) -> Dict:
+        return {
+            **summary,
+            'raw_summary': f"TOPIC: {summary['topic']}\nKEY_POINTS:\n{summary['key_points']}\n"
+                           f"ACTION: {summary['action_required']}",
+            'provider': 'synthetic',
+        }
+
+def generate_mailbox(db, count: int, seed: Optional[int] = None, batch_size: int = 5000, **options) -> int:
+    """Bulk-load `count` synthetic emails into a DatabaseManager, return how many were inserted"""
+    mailbox = SyntheticMailbox(seed=seed if seed is not None else random.randrange(2 ** 32), **options)
+    return db.bulk_insert_emails(mailbox.emails(count), batch_size=batch_size)
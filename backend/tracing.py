@@ -0,0 +1,99 @@
+"""Lightweight request tracing with nested spans.
+
+A trace is a tree of Span objects carried in a context variable, so spans
+opened anywhere below (Gmail calls, LLM calls, DatabaseManager methods) attach
+to the request that caused them, including work handed to thread pools that
+copy the context. Outside an active trace ``span()`` is a no-op, which keeps
+tracing free when it is switched off.
+"""
+
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class Span:
+    __slots__ = ('name', 'attrs', 'start', 'duration', 'children')
+
+    def __init__(self, name: str, attrs: Optional[Dict] = None):
+        self.name = name
+        self.attrs = attrs or {}
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.children: List['Span'] = []
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.start
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'attrs': self.attrs,
+            'duration_ms': round((self.duration or 0) * 1000, 3),
+            'children': [child.to_dict() for child in self.children],
+        }
+
+_current_span: ContextVar[Optional[Span]] = ContextVar('inboxprism_span', default=None)
+
+# Span trees of recent slow requests, newest last
+SLOW_TRACES: Deque[Dict] = deque(maxlen=50)
+
+@contextmanager
+def span(name: str, **attrs):
+    """Open a child span of the active trace; does nothing without one"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = Span(name, attrs)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.attrs['error'] = type(e).__name__
+        raise
+    finally:
+        child.finish()
+        _current_span.reset(token)
+
+@contextmanager
+def trace(name: str, **attrs):
+    """Start a new trace rooted at this span"""
+    root = Span(name, attrs)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.attrs['error'] = type(e).__name__
+        raise
+    finally:
+        root.finish()
+        _current_span.reset(token)
+
+def render_tree(root: Span) -> str:
+    """Indented text rendering of a span tree with durations"""
+    lines = []
+
+    def walk(node: Span, depth: int):
+        attrs = ' '.join(f'{key}={value}' for key, value in node.attrs.items())
+        lines.append(f"{'  ' * depth}{node.name} {(node.duration or 0) * 1000:.1f}ms {attrs}".rstrip())
+        for child in node.children:
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return '\n'.join(lines)
+
+def record_if_slow(root: Span, threshold_ms: float) -> bool:
+    """Log and keep the span tree of a trace that took longer than threshold_ms"""
+    if threshold_ms <= 0 or (root.duration or 0) * 1000 < threshold_ms:
+        return False
+
+    SLOW_TRACES.append(root.to_dict())
+    logger.warning(f"Slow request ({root.duration * 1000:.0f}ms > {threshold_ms:g}ms):\n{render_tree(root)}")
+    return True
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+InboxPrism - API load-test suite at several mailbox sizes
+Usage: python benchmarks/api_suite.py [--sizes 10000,100000,1000000] [--clients 16] [--duration 10]
+
+For each size a synthetic mailbox is generated once (cached in --fixtures-dir),
+copied to a scratch database and served by a fresh uvicorn process using the
+offline "synthetic" LLM provider. GET /api/emails, GET /api/stats and
+POST /api/summarize/{id} are then hammered in turn with concurrent clients.
+
+The response cache is disabled unless --cache is given, so the read endpoints
+measure the query cost at each size rather than cache hits.
+"""
+
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from load_test import load_test
+
+from backend.database.manager import DatabaseManager
+from backend.services.synthetic_data import generate_mailbox
+
+ENDPOINTS = [
+    ('GET', '/api/emails'),
+    ('GET', '/api/stats'),
+    ('POST', '/api/summarize/{id}'),
+]
+
+def build_fixture(directory: str, size: int) -> str:
+    """Generate a mailbox of `size` emails unless a complete one is cached"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"mailbox-{size}.db")
+    if os.path.exists(path) and DatabaseManager(path).get_stats()['total_emails'] == size:
+        return path
+
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    start = time.perf_counter()
+    generate_mailbox(DatabaseManager(path), size, seed=size)
+    elapsed = time.perf_counter() - start
+    print(f"generated {size} emails in {elapsed:.1f}s ({size / elapsed:.0f}/s), "
+          f"{os.path.getsize(path) / 1e6:.0f} MB")
+    return path
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(db_path: str, port: int, args) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_PATH=db_path,
+        DEFAULT_PROVIDER='synthetic',
+        SYNTHETIC_LLM_LATENCY_MS=str(args.llm_latency_ms),
+        LOG_LEVEL='WARNING',
+    )
+    if not args.cache:
+        env['RESPONSE_CACHE_ENTRIES'] = '0'
+
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'backend.api.main:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.perf_counter() + 60
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.05)
+    server.terminate()
+    raise TimeoutError('API did not start within 60s')
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the API against synthetic mailboxes of several sizes')
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='Comma-separated mailbox sizes')
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent clients per endpoint')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per endpoint')
+    parser.add_argument('--fixtures-dir', default='/tmp/inboxprism-fixtures', help='Where generated mailboxes are cached')
+    parser.add_argument('--llm-latency-ms', type=float, default=500, help='Simulated LLM latency for /api/summarize')
+    parser.add_argument('--cache', action='store_true', help='Keep the response cache enabled')
+
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    rows = []
+    for size in sizes:
+        fixture = build_fixture(args.fixtures_dir, size)
+
+        # Summaries written by the run must not leak into the cached fixture
+        scratch = os.path.join(args.fixtures_dir, f"run-{size}.db")
+        shutil.copyfile(fixture, scratch)
+
+        port = free_port()
+        server = start_server(scratch, port, args)
+        try:
+            for method, path in ENDPOINTS:
+                result = load_test(f'http://127.0.0.1:{port}', path, args.clients, args.duration,
+                                   method=method, ids=size)
+                rows.append((size, result))
+                print(f"{size:>9}  {method:4} {path:22} rps={result['rps']:.1f}  p50={result['p50_ms']:.1f}ms  "
+                      f"p95={result['p95_ms']:.1f}ms  p99={result['p99_ms']:.1f}ms  errors={result['errors']}")
+        finally:
+            server.terminate()
+            server.wait()
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(scratch + suffix):
+                    os.remove(scratch + suffix)
+
+    print()
+    print(f"{'emails':>9}  {'endpoint':27} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+    for size, result in rows:
+        print(f"{size:>9}  {result['method']:4} {result['path']:22} {result['rps']:>8.1f} "
+              f"{result['p50_ms']:>7.1f}ms {result['p95_ms']:>7.1f}ms {result['p99_ms']:>7.1f}ms {result['errors']:>7}")
+
+if __name__ == '__main__':
+    main()
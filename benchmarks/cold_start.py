@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+InboxPrism - cold start benchmark
+Usage: python benchmarks/cold_start.py [--top 15] [--budget-ms 800] [--no-serve]
+
+Reports the `python -X importtime` profile of `import backend.api.main`
+(total and the slowest modules by cumulative time), then starts uvicorn and
+measures the time until the first successful GET /health. With --budget-ms
+the script exits non-zero when the import time goes over budget, so it can
+guard against regressions in CI.
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def import_profile(module: str) -> List[Tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) for every import of a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return entries
+
+def time_to_first_health(port: int, timeout: float = 30.0) -> float:
+    """Start uvicorn and return seconds until /health answers 200"""
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'backend.api.main:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f'/health did not answer within {timeout}s')
+    finally:
+        server.terminate()
+        server.wait()
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure API import time and time to first /health')
+    parser.add_argument('--module', default='backend.api.main', help='Module to import')
+    parser.add_argument('--top', type=int, default=15, help='Slowest modules to list')
+    parser.add_argument('--budget-ms', type=float, help='Fail if the import takes longer than this')
+    parser.add_argument('--no-serve', action='store_true', help='Skip the /health measurement')
+
+    args = parser.parse_args()
+
+    entries = import_profile(args.module)
+    total_ms = next((cumulative for name, _, cumulative in entries if name.strip() == args.module), 0) / 1000
+
+    print(f"import {args.module}: {total_ms:.0f}ms")
+    print(f"{'cumulative':>12} {'self':>9}  module")
+    for name, self_us, cumulative_us in sorted(entries, key=lambda e: e[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>7.1f}ms  {name}")
+
+    if not args.no_serve:
+        print(f"time to first /health: {time_to_first_health(free_port()) * 1000:.0f}ms")
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"import time {total_ms:.0f}ms exceeds budget {args.budget_ms:.0f}ms")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
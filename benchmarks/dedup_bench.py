@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+InboxPrism - Near-duplicate index benchmark
+Usage: python benchmarks/dedup_bench.py [--count 100000] [--lookups 2000] [--seed 0]
+
+Generates a synthetic mailbox, then reports SimHash fingerprint throughput,
+bulk insert throughput with clustering at ingest, cluster lookup latency for
+fresh emails, and how well the clusters line up with the template each email
+was generated from (purity). Clusters only group emails for display; the
+"reuse" line counts emails whose summary could be copied from the first
+member of their cluster under the stricter can_reuse rule.
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from backend.database.manager import DatabaseManager
+from backend.dedup import can_reuse, fingerprint
+from backend.services.synthetic_data import MONTHS, PROJECTS, SyntheticMailbox
+
+_NUMBERS = re.compile(r"\d+")
+_VALUES = re.compile(r"\d+|\b(?:%s)\b" % '|'.join(PROJECTS + MONTHS))
+
+def template_label(subject: str) -> str:
+    """Subject with generated values blanked out, i.e. which template it came from"""
+    return _VALUES.sub('_', subject.removeprefix('Re: '))
+
+def subject_label(subject: str) -> str:
+    """Subject with only numbers blanked out, so project and month still tell emails apart"""
+    return _NUMBERS.sub('_', subject.removeprefix('Re: '))
+
+def purity(members) -> float:
+    """Fraction of clustered emails whose label is the most common one in their cluster"""
+    clustered = sum(len(labels) for labels in members.values())
+    pure = sum(Counter(labels).most_common(1)[0][1] for labels in members.values())
+    return pure / max(clustered, 1)
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark near-duplicate indexing and lookup')
+    parser.add_argument('--count', type=int, default=100000, help='Emails to index')
+    parser.add_argument('--lookups', type=int, default=2000, help='Fresh emails to look up after indexing')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=5000)
+
+    args = parser.parse_args()
+
+    mailbox = SyntheticMailbox(seed=args.seed, summary_rate=0)
+    emails = list(mailbox.emails(args.count))
+    fresh = list(mailbox.emails(args.lookups))
+
+    start = time.perf_counter()
+    for email in emails:
+        fingerprint(email['body'])
+    elapsed = time.perf_counter() - start
+    print(f"fingerprint:  {args.count / elapsed:,.0f} emails/s ({elapsed * 1e6 / args.count:.0f} µs/email)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseManager(os.path.join(directory, 'dedup.db'))
+
+        start = time.perf_counter()
+        db.bulk_insert_emails(emails, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"bulk insert:  {args.count / elapsed:,.0f} emails/s with clustering ({elapsed:.1f}s)")
+
+        latencies = []
+        for email in fresh:
+            start = time.perf_counter()
+            db.find_cluster(email['body'])
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"lookup:       p50={percentile(latencies, 50):.2f}ms  p95={percentile(latencies, 95):.2f}ms  "
+              f"p99={percentile(latencies, 99):.2f}ms")
+
+        conn = sqlite3.connect(db.db_path)
+        rows = conn.execute('SELECT subject, cluster_id FROM emails ORDER BY id').fetchall()
+        conn.close()
+
+    templates, subjects = defaultdict(list), defaultdict(list)
+    first_members = {}
+    unclustered = reusable = 0
+    # Rows come back in insertion order, so they line up with `emails`
+    for email, (subject, cluster_id) in zip(emails, rows):
+        if cluster_id is None:
+            unclustered += 1
+            continue
+        templates[cluster_id].append(template_label(subject))
+        subjects[cluster_id].append(subject_label(subject))
+        first = first_members.setdefault(cluster_id, email)
+        if first is not email and can_reuse(first, email):
+            reusable += 1
+
+    clustered = len(rows) - unclustered
+    largest = max((len(labels) for labels in templates.values()), default=0)
+
+    print(f"clusters:     {len(templates):,} for {clustered:,} emails ({unclustered:,} too short to fingerprint), "
+          f"largest {largest:,}")
+    print(f"reuse:        {reusable:,} of {len(rows):,} summaries ({reusable / len(rows):.1%}) "
+          f"could be copied from their cluster's first email instead of generated")
+    # Differing projects/months are one-word changes that reuse_summary swaps in from the subject
+    print(f"purity:       {purity(templates):.2%} by template, "
+          f"{purity(subjects):.2%} by subject with project and month")
+
+if __name__ == '__main__':
+    main()
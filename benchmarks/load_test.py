@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+InboxPrism - API load test
+Usage: python benchmarks/load_test.py [--url http://localhost:8000] [--path /api/emails] [--clients 32] [--duration 10]
+       python benchmarks/load_test.py --method POST --path '/api/summarize/{id}' --ids 10000
+
+Each client holds a keep-alive connection and issues requests back to back
+for the given duration; throughput and latency percentiles are reported at
+the end. A ``{id}`` in the path is replaced by a random id in [1, --ids] on
+every request. Uses only the standard library so it runs anywhere the API does.
+"""
+
+import argparse
+import http.client
+import random
+import threading
+import time
+from typing import Dict, List
+from urllib.parse import urlparse
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def run_client(url, path: str, method: str, deadline: float, latencies: List[float], errors: List[int],
+               conditional: bool = False, ids: int = 1):
+    """Issue requests on one connection until the deadline passes"""
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=60)
+    etag = None
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            # Poll like a browser would, revalidating with the last ETag
+            headers = {'If-None-Match': etag} if conditional and etag else {}
+            conn.request(method, path.replace('{id}', str(random.randint(1, ids))), headers=headers)
+            response = conn.getresponse()
+            response.read()
+            etag = response.getheader('ETag') or etag
+            if response.status >= 400:
+                errors.append(response.status)
+        except Exception:
+            errors.append(0)
+            conn.close()
+            conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=60)
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+def load_test(base_url: str, path: str, clients: int, duration: float, method: str = 'GET',
+              conditional: bool = False, ids: int = 1) -> Dict:
+    """Hammer one endpoint with concurrent clients and return the results"""
+    url = urlparse(base_url)
+    latencies: List[float] = []
+    errors: List[int] = []
+    deadline = time.perf_counter() + duration
+
+    threads = [
+        threading.Thread(target=run_client, args=(url, path, method, deadline, latencies, errors, conditional, ids))
+        for _ in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'method': method,
+        'path': path,
+        'clients': clients,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+def format_result(result: Dict) -> str:
+    return (
+        f"{result['method']} {result['path']}  clients={result['clients']}  "
+        f"requests={result['requests']}  errors={result['errors']}  "
+        f"rps={result['rps']:.1f}  p50={result['p50_ms']:.1f}ms  "
+        f"p95={result['p95_ms']:.1f}ms  p99={result['p99_ms']:.1f}ms"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test InboxPrism API endpoints')
+    parser.add_argument('--url', default='http://localhost:8000', help='Base URL of a running API')
+    parser.add_argument('--path', action='append', help='Endpoint path to test (repeatable)')
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent clients')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run each endpoint')
+    parser.add_argument('--method', default='GET', help='HTTP method')
+    parser.add_argument('--ids', type=int, default=1, help='Upper bound for {id} placeholders in paths')
+    parser.add_argument('--conditional', action='store_true', help='Revalidate with If-None-Match like a polling client')
+
+    args = parser.parse_args()
+
+    for path in args.path or ['/api/emails']:
+        print(format_result(load_test(args.url, path, args.clients, args.duration, method=args.method,
+                                      conditional=args.conditional, ids=args.ids)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+InboxPrism - /api/emails serialization benchmark
+Usage: python benchmarks/serialization_bench.py [--rows 10000] [--db /tmp/inboxprism-bench.db]
+
+Compares, for one listing of --rows emails:
+  json    get_emails_with_summaries() + standard-library json (previous path)
+  orjson  get_emails_with_summaries() + orjson, one buffered body
+  ndjson  iter_emails_with_summaries() streamed through orjson in batches
+
+Each mode runs in a fresh subprocess so its peak RSS is measured in isolation.
+"""
+
+import argparse
+import json
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database.manager import DatabaseManager, compress_body, make_preview
+
+MODES = ('json', 'orjson', 'ndjson')
+
+def build_fixture(path: str, rows: int):
+    """Create a database with `rows` summarized emails unless it already has them"""
+    db = DatabaseManager(path)
+    if db.get_stats()['total_emails'] >= rows:
+        return
+
+    body = "Hi team, please review the attached quarterly numbers before Friday's sync. " * 20
+    now = datetime.now()
+    conn = sqlite3.connect(path)
+    with conn:
+        for i in range(rows):
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO emails (message_id, sender, subject, preview, received_at) VALUES (?, ?, ?, ?, ?)',
+                (f'bench-{i}', f'sender{i % 500}@example.com', f'Quarterly update #{i}', make_preview(body),
+                 now - timedelta(minutes=i))
+            )
+            email_id = cursor.lastrowid
+            conn.execute('INSERT INTO email_bodies (email_id, codec, body) VALUES (?, ?, ?)',
+                         (email_id, 'zlib', compress_body(body)))
+            conn.execute(
+                'INSERT INTO summaries (email_id, topic, key_points, action_required, raw_summary, provider) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (email_id, 'Quarterly numbers review', '• Review numbers\n• Sync on Friday', 'Review before Friday',
+                 'TOPIC: Quarterly numbers review', 'gemini')
+            )
+    conn.close()
+
+def run_mode(mode: str, path: str, rows: int):
+    from backend.api.serialization import dumps, dumps_lines
+
+    db = DatabaseManager(path)
+    sink = open(os.devnull, 'wb')
+
+    start = time.perf_counter()
+    if mode == 'json':
+        emails = db.get_emails_with_summaries(limit=rows)
+        body = json.dumps({'emails': emails, 'count': len(emails)}, ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+        sink.write(body)
+        size = len(body)
+    elif mode == 'orjson':
+        emails = db.get_emails_with_summaries(limit=rows)
+        body = dumps({'emails': emails, 'count': len(emails)})
+        sink.write(body)
+        size = len(body)
+    else:
+        size = 0
+        for batch in db.iter_emails_with_summaries(limit=rows):
+            chunk = dumps_lines(batch)
+            sink.write(chunk)
+            size += len(chunk)
+    elapsed = time.perf_counter() - start
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'mode': mode, 'ms': elapsed * 1000, 'peak_rss_mb': peak_kb / 1024, 'bytes': size}))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark /api/emails serialization paths')
+    parser.add_argument('--rows', type=int, default=10000, help='Emails to list')
+    parser.add_argument('--db', default='/tmp/inboxprism-bench.db', help='Fixture database path')
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.db, args.rows)
+        return
+
+    build_fixture(args.db, args.rows)
+    print(f"{'mode':8} {'time':>10} {'peak RSS':>10} {'bytes':>12}")
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--mode', mode, '--db', args.db, '--rows', str(args.rows)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:8} {result['ms']:>8.1f}ms {result['peak_rss_mb']:>8.1f}MB {result['bytes']:>12}")
+
+if __name__ == '__main__':
+    main()
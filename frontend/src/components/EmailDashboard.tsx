@@ -1,6 +1,6 @@
 'use client'
 
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { RefreshCw, Download, Clock, User, Calendar, AlertCircle } from 'lucide-react'
 import { formatDistanceToNow } from 'date-fns'
@@ -11,6 +11,7 @@ interface Email {
   sender: string
   subject: string
   received_at: string
+  cluster_id?: number | null
   summary?: {
     topic: string
     key_points: string
@@ -31,6 +32,23 @@ interface StatsResponse {
   summary_rate: number
 }
 
+// Collapse near-duplicates: keep the first (newest) email of each cluster and count the rest
+const collapseClusters = (emails: Email[]) => {
+  const groups = new Map<number, { email: Email; similar: number }>()
+  const rows: { email: Email; similar: number }[] = []
+  for (const email of emails) {
+    const group = email.cluster_id != null ? groups.get(email.cluster_id) : undefined
+    if (group) {
+      group.similar += 1
+      continue
+    }
+    const row = { email, similar: 0 }
+    if (email.cluster_id != null) groups.set(email.cluster_id, row)
+    rows.push(row)
+  }
+  return rows
+}
+
 // API functions
 const fetchEmails = async (): Promise<EmailsResponse> => {
   const response = await fetch(API_ENDPOINTS.emails)
@@ -70,6 +88,28 @@ export default function EmailDashboard() {
     queryFn: fetchStats,
   })
 
+  // Live updates: refetch when the server reports a write instead of polling
+  useEffect(() => {
+    const source = new EventSource(API_ENDPOINTS.events)
+    // A fetch sends two events per email: refetch at most once per second, not once per event
+    let pending: ReturnType<typeof setTimeout> | undefined
+    const refresh = () => {
+      if (pending !== undefined) return
+      pending = setTimeout(() => {
+        pending = undefined
+        queryClient.invalidateQueries({ queryKey: ['emails'] })
+        queryClient.invalidateQueries({ queryKey: ['stats'] })
+      }, 1000)
+    }
+    for (const type of ['email-saved', 'summary-saved', 'data-changed', 'reset']) {
+      source.addEventListener(type, refresh)
+    }
+    return () => {
+      source.close()
+      clearTimeout(pending)
+    }
+  }, [queryClient])
+
   const fetchEmailsMutation = useMutation({
     mutationFn: ({ hours, summarize }: { hours: number; summarize: boolean }) =>
       fetchNewEmails(hours, summarize),
@@ -248,8 +288,8 @@ export default function EmailDashboard() {
               <p className="text-sm">Try fetching some emails first using the button above.</p>
             </div>
           ) : (
-            emails?.emails?.map((email) => (
-              <EmailCard key={email.id} email={email} />
+            collapseClusters(emails?.emails || []).map(({ email, similar }) => (
+              <EmailCard key={email.id} email={email} similar={similar} />
             ))
           )}
         </div>
@@ -258,7 +298,7 @@ export default function EmailDashboard() {
   )
 }
 
-function EmailCard({ email }: { email: Email }) {
+function EmailCard({ email, similar }: { email: Email; similar: number }) {
   return (
     <div className="p-6 hover:bg-white/5 transition-all duration-200 group">
       <div className="flex flex-col lg:flex-row lg:items-start lg:justify-between gap-6">
@@ -282,6 +322,11 @@ function EmailCard({ email }: { email: Email }) {
           <h3 className="text-lg font-semibold text-white mb-2 leading-tight group-hover:text-gradient transition-colors duration-300">
             {email.subject}
           </h3>
+          {similar > 0 && (
+            <p className="text-xs text-gray-400">
+              +{similar} similar {similar === 1 ? 'email' : 'emails'}
+            </p>
+          )}
         </div>
 
         {email.summary && (
@@ -17,6 +17,7 @@ if (typeof window !== 'undefined') {
 export const API_ENDPOINTS = {
   emails: `${API_BASE_URL}/api/emails`,
   stats: `${API_BASE_URL}/api/stats`,
+  events: `${API_BASE_URL}/api/events`,
   fetchEmails: `${API_BASE_URL}/api/fetch-emails`,
   summarizeEmail: (id: number) => `${API_BASE_URL}/api/summarize/${id}`,
 }
@@ -1,106 +1,532 @@
 #!/usr/bin/env python3
 """
 InboxPrism - Production Email Processing Service
-Usage: python run_processor.py [--hours 24] [--no-summarize]
+Usage: python run_processor.py [--hours 24] [--no-summarize] [--account ID | --all-accounts --workers 4] [--profile [DIR]]
+       python run_processor.py --daemon [--interval 300] [--jitter 0.1]
+       python run_processor.py summarize [--workers 4]
+       python run_processor.py redrive
+       python run_processor.py generate --count 100000 [--seed 1]
+       python run_processor.py cluster
+       python run_processor.py digest [--date 2024-01-31] [--rebuild]
+       python run_processor.py retention [--body-days 30] [--archive-days 365]
 """
 
 import argparse
 import asyncio
+import fcntl
+import random
+import signal
 import sys
 import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from datetime import date
+from typing import Dict, List, Optional
 
-# Add backend to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from database.manager import DatabaseManager
-from services.gmail_service import GmailService
-from services.ai_service import AIService
-from config.config import settings
+from backend.database.manager import DatabaseManager
+from backend.config import settings
+from backend.metrics import REGISTRY
+from backend.profiling import SamplingProfiler
+from backend.tracing import render_tree, trace
 import logging
 
-logging.basicConfig(level=settings.LOG_LEVEL, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+logging.basicConfig(level=settings.log_level, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
 logger = logging.getLogger(__name__)
 
-def main():
-    parser = argparse.ArgumentParser(description='Process emails with AI summarization')
-    parser.add_argument('--hours', type=int, default=24, help='Hours to look back for emails')
-    parser.add_argument('--no-summarize', action='store_true', help='Skip AI summarization')
-    parser.add_argument('--force-provider', choices=['gemini', 'azure'], help='Force specific AI provider')
+class WarmClients:
+    """Gmail, LLM and database clients kept alive across processing cycles
 
-    args = parser.parse_args()
+    One-shot runs build them once; daemon mode and long-lived pool workers
+    reuse them, so authentication, discovery documents, provider SDK setup
+    and schema checks are paid once per process instead of once per cycle.
+    """
+
+    def __init__(self, force_provider: Optional[str] = None):
+        from backend.database.shards import ShardRegistry
+        from backend.services.account_service import AccountService
+
+        self.force_provider = force_provider
+        self.accounts = AccountService(settings)
+        self.shards = ShardRegistry(self.accounts.database_path)
+        self._ai_service = None
+
+    def db(self, account: str) -> DatabaseManager:
+        return self.shards.get(account)
+
+    def gmail(self, account: str):
+        gmail_service = self.accounts.gmail_service(account)
+        gmail_service.refresh_if_expiring(settings.token_refresh_margin_seconds)
+        return gmail_service
+
+    def ai(self):
+        if self._ai_service is None:
+            from backend.services.ai_service import AIService
+
+            self._ai_service = AIService()
+            # Override provider if specified
+            if self.force_provider:
+                self._ai_service.provider = self.force_provider
+                self._ai_service._init_client()
+        return self._ai_service
+
+_clients: Optional[WarmClients] = None
+_in_worker = False
+
+def get_clients(force_provider: Optional[str] = None) -> WarmClients:
+    global _clients
+    if _clients is None or _clients.force_provider != force_provider:
+        _clients = WarmClients(force_provider)
+    return _clients
+
+def summary_worker(clients: WarmClients, db: DatabaseManager):
+    from backend.services.summary_queue import SummaryWorker
+
+    return SummaryWorker(
+        db, clients.ai,
+        lease_seconds=settings.summary_lease_seconds,
+        max_attempts=settings.summary_max_attempts,
+        retry_base_seconds=settings.summary_retry_base_seconds,
+        retry_max_seconds=settings.summary_retry_max_seconds,
+    )
+
+def digest_refresher(clients: WarmClients, db: DatabaseManager):
+    from backend.services.digest_service import DigestRefresher
+
+    return DigestRefresher(
+        db, clients.ai,
+        quiet_seconds=settings.digest_quiet_seconds,
+        max_wait_seconds=settings.digest_max_wait_seconds,
+        overview_days=settings.digest_overview_days,
+    )
+
+def init_worker():
+    """Pool worker setup: the parent process owns signal handling and shutdown"""
+    global _in_worker
+    _in_worker = True
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+def sync_account(account: str, hours: int = 24, summarize: bool = True,
+                 force_provider: Optional[str] = None, max_emails: Optional[int] = None,
+                 stop: Optional[threading.Event] = None) -> Dict:
+    """Fetch, save and summarize one account's emails into its own shard
+
+    When ``stop`` is set the email in progress is finished and the rest are
+    left for the next run.
+    """
+    clients = get_clients(force_provider)
+    db = clients.db(account)
+
+    # Fetch emails
+    emails = clients.gmail(account).fetch_emails(hours=hours, max_results=max_emails)
+
+    processed = 0
+    summarized = 0
+
+    if not emails:
+        logger.info(f"✅ [{account}] No new emails found")
+    else:
+        logger.info(f"📨 [{account}] Processing {len(emails)} emails...")
+
+    for email in emails:
+        if stop is not None and stop.is_set():
+            logger.info(f"🛑 [{account}] Stopping, {len(emails) - processed} emails left for the next run")
+            break
+
+        try:
+            # Saving also queues the summary job, so a crash never loses track of it
+            db.save_email(
+                message_id=email['message_id'],
+                sender=email['sender'],
+                subject=email['subject'],
+                body=email['body'],
+                received_at=email['received_at']
+            )
+            processed += 1
+        except Exception as e:
+            logger.error(f"❌ [{account}] Error processing email: {e}")
+            continue
+
+    # Drain the queue, including jobs left over from earlier runs and due retries
+    if summarize:
+        result = summary_worker(clients, db).run(stop=stop)
+        summarized = result['done']
+        if result['failed']:
+            logger.warning(f"⚠️ [{account}] {result['failed']} summaries failed and will be retried")
+
+        # Overviews of days whose summaries have settled; a burst still being summarized waits
+        overviews = digest_refresher(clients, db).run(stop=stop)
+        if overviews['generated']:
+            logger.info(f"📰 [{account}] Regenerated {overviews['generated']} digest overview(s)")
+
+    if emails:
+        # Show stats
+        stats = db.get_stats()
+        logger.info(f"📊 [{account}] Total emails: {stats['total_emails']}, "
+                    f"summaries: {stats['total_summaries']} ({stats['summary_rate']:.1f}%)")
+
+    # Workers hand their metrics to the parent, which owns the summary
+    return {'account': account, 'processed': processed, 'summarized': summarized,
+            'metrics': REGISTRY.drain() if _in_worker else None}
+
+def process_emails(args, pool: Optional[ProcessPoolExecutor] = None, stop: Optional[threading.Event] = None):
+    account_ids = selected_accounts(args)
 
     logger.info(f"🚀 Starting InboxPrism processor...")
-    logger.info(f"📧 Fetching emails from last {args.hours} hours")
-    logger.info(f"🤖 AI Provider: {settings.provider()}")
+    logger.info(f"📧 Fetching emails from last {args.hours} hours for {len(account_ids)} account(s)")
+    logger.info(f"🤖 AI Provider: {args.force_provider or settings.default_provider}")
 
-    try:
-        # Initialize services
-        db = DatabaseManager()
-        gmail_service = GmailService()
-        ai_service = AIService()
+    options = {
+        'hours': args.hours,
+        'summarize': not args.no_summarize,
+        'force_provider': args.force_provider,
+        'max_emails': args.max_emails,
+    }
+
+    results = []
+    if len(account_ids) == 1 or args.workers <= 1:
+        for account in account_ids:
+            if stop is not None and stop.is_set():
+                break
+            try:
+                results.append(sync_account(account, stop=stop, **options))
+            except Exception as e:
+                logger.error(f"❌ [{account}] Sync failed: {e}")
+    else:
+        # One task per account and a per-run email cap keep large mailboxes
+        # from starving the others; each worker writes only its own shard
+        own_pool = pool is None
+        if own_pool:
+            pool = ProcessPoolExecutor(max_workers=min(args.workers, len(account_ids)), initializer=init_worker)
+        try:
+            futures = {pool.submit(sync_account, account, **options): account for account in account_ids}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                    if result['metrics']:
+                        REGISTRY.merge(result['metrics'])
+                    results.append(result)
+                except Exception as e:
+                    logger.error(f"❌ [{futures[future]}] Sync failed: {e}")
+        finally:
+            if own_pool:
+                pool.shutdown(wait=True)
 
-        # Override provider if specified
-        if args.force_provider:
-            ai_service.provider = args.force_provider
-            ai_service._init_client()
+    # Show results
+    logger.info(f"✅ Processed {sum(r['processed'] for r in results)} emails")
+    logger.info(f"🧠 Summarized {sum(r['summarized'] for r in results)} emails")
 
-        # Fetch emails
-        emails = gmail_service.fetch_emails(hours=args.hours)
+@contextmanager
+def run_lock(path: str):
+    """Exclusive, non-blocking lock across processes; yields False if another run holds it"""
+    with open(path, 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
 
-        if not emails:
-            logger.info("✅ No new emails found")
+def run_cycle(args, pool: Optional[ProcessPoolExecutor] = None, stop: Optional[threading.Event] = None):
+    """Run one processing cycle unless a previous one is still running"""
+    with run_lock(args.lock_file) as acquired:
+        if not acquired:
+            logger.warning("⏭ Previous run still in progress, skipping this cycle")
             return
+        process_emails(args, pool=pool, stop=stop)
 
-        logger.info(f"📨 Processing {len(emails)} emails...")
+def run_daemon(args):
+    """Poll on a fixed schedule with warm clients until SIGTERM/SIGINT"""
+    stop = threading.Event()
 
-        processed = 0
-        summarized = 0
+    def request_stop(signum, frame):
+        logger.info(f"🛑 Received {signal.Signals(signum).name}, finishing in-flight work...")
+        stop.set()
 
-        for email in emails:
-            try:
-                # Save email
-                email_id = db.save_email(
-                    message_id=email['message_id'],
-                    sender=email['sender'],
-                    subject=email['subject'],
-                    body=email['body'],
-                    received_at=email['received_at']
-                )
-                processed += 1
-
-                # Summarize if enabled and has content
-                if not args.no_summarize and email['body'].strip():
-                    logger.info(f"🧠 Summarizing: {email['subject'][:50]}...")
-
-                    summary = ai_service.summarize_email(email['body'])
-
-                    db.save_summary(
-                        email_id=email_id,
-                        topic=summary['topic'],
-                        key_points=summary['key_points'],
-                        action_required=summary['action_required'],
-                        raw_summary=summary['raw_summary'],
-                        provider=summary['provider']
-                    )
-                    summarized += 1
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
 
+    account_count = len(selected_accounts(args))
+    pool = None
+    if account_count > 1 and args.workers > 1:
+        # Long-lived workers keep their own warm clients between cycles
+        pool = ProcessPoolExecutor(max_workers=min(args.workers, account_count), initializer=init_worker)
+
+    logger.info(f"🔁 Daemon mode: every {args.interval}s (±{args.jitter:.0%} jitter)")
+
+    next_run = time.monotonic()
+    try:
+        while not stop.is_set():
+            try:
+                # A trace per cycle keeps span trees bounded over a long-lived process
+                with (trace('run_processor cycle') if args.profile else nullcontext()) as root:
+                    run_cycle(args, pool=pool, stop=stop)
+                if args.profile:
+                    logger.info(f"🔍 Span tree:\n{render_tree(root)}")
             except Exception as e:
-                logger.error(f"❌ Error processing email: {e}")
-                continue
+                logger.error(f"❌ Cycle failed: {e}")
 
-        # Show results
-        logger.info(f"✅ Processed {processed} emails")
-        logger.info(f"🧠 Summarized {summarized} emails")
+            # Keep the schedule anchored; cycles that overran are skipped, not queued
+            next_run += args.interval
+            now = time.monotonic()
+            if now > next_run:
+                missed = int((now - next_run) // args.interval) + 1
+                logger.warning(f"⏭ Cycle overran the interval, skipping {missed} cycle(s)")
+                next_run += missed * args.interval
 
-        # Show stats
-        stats = db.get_stats()
-        logger.info(f"📊 Total emails: {stats['total_emails']}")
-        logger.info(f"📊 Total summaries: {stats['total_summaries']}")
-        logger.info(f"📊 Summary rate: {stats['summary_rate']:.1f}%")
+            delay = max(0.0, next_run - now + random.uniform(-args.jitter, args.jitter) * args.interval)
+            stop.wait(delay)
+    finally:
+        if pool:
+            # Drain: let in-flight account syncs finish before exiting
+            pool.shutdown(wait=True)
+        logger.info("👋 Daemon stopped")
+
+def drain_queue(account: str, force_provider: Optional[str] = None, max_jobs: Optional[int] = None) -> Dict:
+    """Work through one account's due summary jobs"""
+    clients = get_clients(force_provider)
+    result = summary_worker(clients, clients.db(account)).run(max_jobs=max_jobs)
+    result['account'] = account
+    result['metrics'] = REGISTRY.drain() if _in_worker else None
+    return result
+
+def run_summarize(args):
+    """Drain summary queues, several worker processes per account when --workers > 1"""
+    account_ids = selected_accounts(args)
+    logger.info(f"🧠 Draining summary queues for {len(account_ids)} account(s) with {args.workers} worker(s)")
+
+    results = []
+    if args.workers <= 1:
+        for account in account_ids:
+            results.append(drain_queue(account, args.force_provider, args.max_emails))
+    else:
+        # Workers lease jobs from the same shard, so any split of the work is safe
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as pool:
+            futures = {
+                pool.submit(drain_queue, account, args.force_provider, args.max_emails): account
+                for account in account_ids for _ in range(args.workers)
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                    if result['metrics']:
+                        REGISTRY.merge(result['metrics'])
+                    results.append(result)
+                except Exception as e:
+                    logger.error(f"❌ [{futures[future]}] Summary worker failed: {e}")
+
+    logger.info(f"✅ Summarized {sum(r['done'] for r in results)} emails, "
+                f"{sum(r['failed'] for r in results)} failed attempts")
+    log_job_counts(account_ids)
+
+def run_redrive(args):
+    """Give failed summary jobs a fresh attempt budget"""
+    from backend.services.account_service import AccountService
+
+    accounts = AccountService(settings)
+    account_ids = selected_accounts(args)
+    for account in account_ids:
+        count = DatabaseManager(accounts.database_path(account)).redrive_failed_jobs()
+        logger.info(f"🔁 [{account}] Re-queued {count} failed summary jobs")
+    log_job_counts(account_ids)
+
+def log_job_counts(account_ids: List[str]):
+    from backend.services.account_service import AccountService
+
+    accounts = AccountService(settings)
+    for account in account_ids:
+        counts = DatabaseManager(accounts.database_path(account)).get_job_counts(settings.summary_max_attempts)
+        logger.info(f"📋 [{account}] Summary jobs: " + ', '.join(f"{state} {count}" for state, count in counts.items()))
+
+def run_cluster(args):
+    """Fingerprint and cluster emails saved before near-duplicate detection existed"""
+    from backend.services.account_service import AccountService
+
+    accounts = AccountService(settings)
+    for account in selected_accounts(args):
+        start = time.perf_counter()
+        result = DatabaseManager(accounts.database_path(account)).index_near_duplicates()
+        logger.info(f"🧬 [{account}] Indexed {result['indexed']} emails into {result['clusters']} new clusters "
+                    f"in {time.perf_counter() - start:.1f}s")
+
+def run_digest(args):
+    """Rebuild digest counts and/or regenerate overviews now, bypassing the debounce for --date days"""
+    clients = get_clients(args.force_provider)
+
+    for account in selected_accounts(args):
+        db = clients.db(account)
+        if args.rebuild:
+            start = time.perf_counter()
+            days = db.rebuild_digests()
+            logger.info(f"📰 [{account}] Rebuilt {days} daily digests in {time.perf_counter() - start:.1f}s")
+
+        result = digest_refresher(clients, db).run(days=args.date)
+        logger.info(f"📰 [{account}] Digest overviews: {result['generated']} generated, "
+                    f"{result['skipped']} without summaries, {result['failed']} failed")
+
+def iso_date(value: str) -> str:
+    return date.fromisoformat(value).isoformat()
+
+def run_generate(args):
+    """Bulk-load synthetic emails into each selected account"""
+    from backend.services.account_service import AccountService
+    from backend.services.synthetic_data import generate_mailbox
+
+    accounts = AccountService(settings)
+    for account in selected_accounts(args):
+        db = DatabaseManager(accounts.database_path(account))
+        start = time.perf_counter()
+        inserted = generate_mailbox(db, args.count, seed=args.seed, batch_size=args.batch_size,
+                                    summary_rate=args.summary_rate, days=args.days)
+        elapsed = time.perf_counter() - start
+        logger.info(f"🧪 [{account}] Generated {inserted} synthetic emails in {elapsed:.1f}s "
+                    f"({inserted / elapsed:.0f}/s)")
+
+def log_metrics_summary():
+    lines = REGISTRY.summary()
+    if lines:
+        logger.info("⏱ Timings:")
+        for line in lines:
+            logger.info(f"   {line}")
+
+def selected_accounts(args) -> List[str]:
+    from backend.services.account_service import AccountService
+
+    accounts = AccountService(settings)
+    if args.all_accounts:
+        return accounts.list_accounts()
+
+    for account in args.account:
+        if not accounts.is_known(account):
+            raise ValueError(f"Unknown account: {account}")
+    return args.account
+
+def run_retention(args):
+    from backend.services.account_service import AccountService, DEFAULT_ACCOUNT
+    from backend.services.retention_service import RetentionService
+
+    accounts = AccountService(settings)
+    logger.info(f"🧹 Applying retention: bodies {args.body_days}d, archive {args.archive_days}d (0 = off)")
+
+    for account in selected_accounts(args):
+        archive_dir = args.archive_dir if account == DEFAULT_ACCOUNT else os.path.join(args.archive_dir, account)
+        db = DatabaseManager(accounts.database_path(account))
+        retention = RetentionService(db, body_days=args.body_days, archive_days=args.archive_days, archive_dir=archive_dir)
+        result = retention.run()
+
+        for month, count in sorted(result['archived'].items()):
+            logger.info(f"📦 [{account}] Archived {count} emails from {month}")
+        logger.info(f"🗑 [{account}] Purged {result['bodies_purged']} email bodies")
+        logger.info(f"💾 [{account}] Database size: {result['size_before'] / 1e6:.1f} MB -> {result['size_after'] / 1e6:.1f} MB "
+                    f"({result['pages_released']} pages released)")
+
+def main():
+    parser = argparse.ArgumentParser(description='Process emails with AI summarization')
+    parser.add_argument('--hours', type=int, default=24, help='Hours to look back for emails')
+    parser.add_argument('--no-summarize', action='store_true', help='Skip AI summarization')
+    parser.add_argument('--force-provider', choices=['gemini', 'azure'], help='Force specific AI provider')
+    parser.add_argument('--account', action='append', help='Account to process (repeatable, default: default)')
+    parser.add_argument('--all-accounts', action='store_true', help='Process every configured account')
+    parser.add_argument('--workers', type=int,
+                        help='Processes for syncing several accounts (default: CPU count; summarize: 1)')
+    parser.add_argument('--max-emails', type=int, help='Cap emails fetched per account per run')
+    parser.add_argument('--daemon', action='store_true', help='Keep running and process on a schedule')
+    parser.add_argument('--interval', type=int, default=settings.processor_interval_seconds,
+                        help='Seconds between daemon cycles')
+    parser.add_argument('--jitter', type=float, default=settings.processor_jitter,
+                        help='Random +/- fraction of the interval added to each wait')
+    parser.add_argument('--lock-file', default=settings.processor_lock_path,
+                        help='Lock file that prevents overlapping runs')
+    parser.add_argument('--profile', nargs='?', const=settings.profiles_dir, metavar='DIR',
+                        help='Write a folded-stack profile of this run and log its span tree')
+
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('process', help='Fetch and summarize emails (default)')
+
+    summarize_parser = subparsers.add_parser('summarize', help='Drain the summary job queue (--workers processes per account)')
+    # Also accepted after the subcommand; SUPPRESS keeps the top-level value when omitted
+    summarize_parser.add_argument('--workers', type=int, default=argparse.SUPPRESS, help='Worker processes per account')
+    summarize_parser.add_argument('--max-emails', type=int, default=argparse.SUPPRESS, help='Cap jobs per worker')
+    subparsers.add_parser('redrive', help='Re-queue failed summary jobs with a fresh attempt budget')
+
+    subparsers.add_parser('cluster', help='Index existing emails for near-duplicate detection')
+
+    digest_parser = subparsers.add_parser('digest', help='Regenerate daily digest overviews that are due')
+    digest_parser.add_argument('--date', action='append', metavar='YYYY-MM-DD',
+                               type=iso_date,
+                               help='Regenerate this day now, due or not (repeatable)')
+    digest_parser.add_argument('--rebuild', action='store_true', help='Recompute all digest counts from the emails')
+
+    generate_parser = subparsers.add_parser('generate', help='Bulk-load synthetic emails for load testing')
+    generate_parser.add_argument('--count', type=int, default=10000, help='Emails to generate per account')
+    generate_parser.add_argument('--seed', type=int, help='Seed for reproducible content')
+    generate_parser.add_argument('--summary-rate', type=float, default=0.8, help='Fraction of emails with a summary')
+    generate_parser.add_argument('--days', type=int, default=90, help='Spread received dates over N days')
+    generate_parser.add_argument('--batch-size', type=int, default=5000, help='Emails per insert transaction')
+
+    retention_parser = subparsers.add_parser('retention', help='Purge old bodies, archive old emails and compact the database')
+    retention_parser.add_argument('--body-days', type=int, default=settings.retention_body_days,
+                                  help='Drop bodies of emails older than N days, keeping summaries (0 = keep)')
+    retention_parser.add_argument('--archive-days', type=int, default=settings.retention_archive_days,
+                                  help='Move emails older than N days to monthly archive databases (0 = keep)')
+    retention_parser.add_argument('--archive-dir', default=settings.archive_dir, help='Directory for archive databases')
+
+    args = parser.parse_args()
+    args.account = args.account or ['default']
+    if args.interval <= 0:
+        # Also catches PROCESSOR_INTERVAL_SECONDS, which argparse does not run through type=
+        parser.error(f"--interval must be a positive number of seconds, got {args.interval}")
+    if args.workers is None:
+        # Each summarize worker calls the LLM, so scaling it up is left to the user
+        args.workers = 1 if args.command == 'summarize' else (os.cpu_count() or 1)
+
+    profiler = SamplingProfiler(settings.profile_interval_ms / 1000) if args.profile else None
+
+    # Spans are kept until the trace ends, so only record them when they will be rendered
+    tracing = trace(f"run_processor {args.command or 'process'}") if args.profile else nullcontext()
+    root = None
+
+    try:
+        with tracing as root:
+            if profiler:
+                profiler.start()
+            try:
+                if args.command == 'retention':
+                    run_retention(args)
+                elif args.command == 'summarize':
+                    run_summarize(args)
+                elif args.command == 'redrive':
+                    run_redrive(args)
+                elif args.command == 'generate':
+                    run_generate(args)
+                elif args.command == 'cluster':
+                    run_cluster(args)
+                elif args.command == 'digest':
+                    run_digest(args)
+                elif args.daemon:
+                    run_daemon(args)
+                else:
+                    run_cycle(args)
+            finally:
+                if profiler:
+                    profiler.stop()
 
     except Exception as e:
         logger.error(f"💥 Fatal error: {e}")
         sys.exit(1)
+    finally:
+        log_metrics_summary()
+        if profiler and root is not None:
+            logger.info(f"🔍 Span tree:\n{render_tree(root)}")
+            logger.info(f"🔍 Profile written to {profiler.save(args.profile, args.command or 'process')}")
 
 if __name__ == '__main__':
     main()
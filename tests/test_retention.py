@@ -0,0 +1,20 @@
+import sqlite3
+
+from backend.database.manager import DatabaseManager
+from backend.services.retention_service import RetentionService
+from backend.services.synthetic_data import SyntheticMailbox
+
+def test_retention_empties_freelist_and_shrinks_file(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'emails.db'))
+    db.bulk_insert_emails(SyntheticMailbox(seed=1, days=90).emails(3000))
+
+    result = RetentionService(db, body_days=10, archive_days=60, archive_dir=str(tmp_path / 'archive')).run()
+
+    conn = sqlite3.connect(db.db_path)
+    try:
+        assert conn.execute('PRAGMA freelist_count').fetchone()[0] == 0
+    finally:
+        conn.close()
+    assert result['archived'] and result['bodies_purged']
+    assert result['pages_released'] > 1
+    assert result['size_after'] < result['size_before']